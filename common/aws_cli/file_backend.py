@@ -1,4 +1,9 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from linkedin_realtime_monitor.settings import S3_REGION_NAME, S3_AWS_SECRET_ACCESS_KEY, S3_AWS_ACCESS_KEY_ID, S3_BUCKET_NAME
 import logging
 
@@ -10,45 +15,90 @@ class FilePrefix:
     CRAWL_FRIEND_SCREENSHOT_PREFIX = 'crawl_friend_screenshot'
 
 
+# 大文件（profile 压缩包）分片并发传输，16MB 分片
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=16,
+    io_chunksize=1024 * 1024,
+    use_threads=True,
+)
+
+# 批量上传小文件（截图）时的并发数
+BULK_UPLOAD_WORKERS = 32
+
+# 连接池至少是分片并发数的 2 倍，避免连接池耗尽导致等待
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=max(64, 2 * TRANSFER_CONFIG.max_request_concurrency),
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+)
+
+
+@functools.lru_cache(maxsize=1)
+def get_s3_client():
+    """进程内共享的 S3 client，创建 client 需要加载 service model，开销较大，只创建一次"""
+    session = boto3.Session(
+        aws_access_key_id=S3_AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=S3_AWS_SECRET_ACCESS_KEY,
+        region_name=S3_REGION_NAME,
+    )
+    return session.client('s3', config=S3_CLIENT_CONFIG)
+
+
 class FileBackend(object):
     def __init__(self):
-        session = boto3.Session(
-            aws_access_key_id=S3_AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=S3_AWS_SECRET_ACCESS_KEY,
-            region_name=S3_REGION_NAME,
-        )
-        self.s3_client = session.client('s3')
-        pass
+        self.s3_client = get_s3_client()
 
     def upload_file(self, local_file_path, online_file_name, prefix):
         online_file_path = f'{prefix}/{online_file_name}'
         bucket_name = S3_BUCKET_NAME
         logging.info(f"Uploading {local_file_path} to s3://{bucket_name}/{online_file_path}")
-        self.s3_client.upload_file(Filename=local_file_path, Bucket=bucket_name, Key=online_file_path)
+        self.s3_client.upload_file(Filename=local_file_path, Bucket=bucket_name, Key=online_file_path,
+                                   Config=TRANSFER_CONFIG)
+        logging.info(f"Upload completed: s3://{bucket_name}/{online_file_path}")
+
+    def upload_fileobj(self, fileobj, online_file_name, prefix):
+        """从可读的文件对象流式上传（可以是不支持 seek 的管道），按 TRANSFER_CONFIG 分片，不需要先落盘"""
+        online_file_path = f'{prefix}/{online_file_name}'
+        bucket_name = S3_BUCKET_NAME
+        logging.info(f"Uploading stream to s3://{bucket_name}/{online_file_path}")
+        self.s3_client.upload_fileobj(Fileobj=fileobj, Bucket=bucket_name, Key=online_file_path,
+                                      Config=TRANSFER_CONFIG)
         logging.info(f"Upload completed: s3://{bucket_name}/{online_file_path}")
 
     def download_file(self, local_file_path, online_file_name, prefix):
         online_file_path = f'{prefix}/{online_file_name}'
         bucket_name = S3_BUCKET_NAME
         logging.info(f"Downloading {local_file_path} to s3://{bucket_name}/{online_file_path}")
-        self.s3_client.download_file(bucket_name, online_file_path, local_file_path)
+        self.s3_client.download_file(bucket_name, online_file_path, local_file_path, Config=TRANSFER_CONFIG)
         logging.info(f"Download completed: s3://{bucket_name}/{online_file_path}")
 
+    def upload_many(self, pairs, prefix):
+        """
+        并发上传多个文件，适用于大量小文件（例如截图）
+
+        Args:
+            pairs: [(local_file_path, online_file_name), ...]
+            prefix: FilePrefix 中的前缀
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+        with ThreadPoolExecutor(max_workers=min(BULK_UPLOAD_WORKERS, len(pairs))) as executor:
+            # list() 消费结果，确保任一上传失败时异常能抛出
+            list(executor.map(lambda pair: self.upload_file(pair[0], pair[1], prefix), pairs))
+
 
 def upload_file_to_s3(local_file_path, online_file_path, verbose=False):
 
-    session = boto3.Session(
-        aws_access_key_id=S3_AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=S3_AWS_SECRET_ACCESS_KEY,
-        region_name=S3_REGION_NAME,
-    )
-    s3 = session.client('s3')
+    s3 = get_s3_client()
     bucket_name = S3_BUCKET_NAME
 
     if verbose:
         logging.info(f"Uploading {local_file_path} to s3://{bucket_name}/{online_file_path}")
 
-    s3.upload_file(Filename=local_file_path, Bucket=bucket_name, Key=online_file_path)
+    s3.upload_file(Filename=local_file_path, Bucket=bucket_name, Key=online_file_path, Config=TRANSFER_CONFIG)
 
     if verbose:
         logging.info(f"Upload completed: s3://{bucket_name}/{online_file_path}")
@@ -1,3 +1,4 @@
+import functools
 import logging
 import os
 import subprocess
@@ -16,19 +17,25 @@ value_to_environment = {
 }
 
 
+# 运行期间环境变量不会变化，缓存结果，只在第一次读取时打印日志；
+# 下面几个函数的返回值在第一次调用时固定，之后修改 Env/LocalDev 环境变量不会生效（需要重启进程）
+@functools.lru_cache(maxsize=1)
 def get_env() -> Environment:
     env_value = os.environ.get('Env', Environment.STAGING.value)
     logging.info('Read Env from sys environment, got {}'.format(env_value))
     return value_to_environment[env_value]
 
 
+@functools.lru_cache(maxsize=1)
 def is_prod_env():
     return get_env() == Environment.PROD
 
 
+@functools.lru_cache(maxsize=1)
 def is_staging_env():
     return get_env() == Environment.STAGING
 
 
+@functools.lru_cache(maxsize=1)
 def is_local_dev():
     return os.environ.get('LocalDev', 'False') == 'True'
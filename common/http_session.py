@@ -0,0 +1,22 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_session(pool_connections=16, pool_maxsize=64):
+    """
+    构建带连接池的 requests.Session，用于模块级复用，避免每次请求都重新建立 TCP + TLS 连接
+
+    只对幂等请求在 502/503/504 时重试；重试耗尽后仍返回最后一次的响应，保持和 requests.get 一致的行为
+    """
+    session = requests.Session()
+    # 显式声明长连接和压缩，服务端据此保持连接并返回 gzip 响应体，requests 会自动解压
+    session.headers.update({'Connection': 'keep-alive', 'Accept-Encoding': 'gzip, deflate'})
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
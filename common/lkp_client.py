@@ -2,15 +2,27 @@ import json
 import logging
 import time
 
+import orjson
+
 from urllib.parse import urljoin
-import requests
 
 from common.env import is_prod_env
+from common.http_session import build_session
+from common.ttl_cache import TTLCache
+
+# 模块级复用的 Session，保持和 LKP 的 keep-alive 连接
+_session = build_session()
+
+# 账号查询结果的短期缓存，同一个账号在 TTL 内不再重复请求 /api/linkedin-account/
+ACCOUNT_CACHE_TTL = 60
+ACCOUNT_CACHE_MAXSIZE = 1024
+_account_cache = TTLCache(ACCOUNT_CACHE_TTL, ACCOUNT_CACHE_MAXSIZE)
 
 
 class LKPClient(object):
     def __init__(self):
         self.base_url = 'https://lkp-v2.tuilink.io/'
+        self.session = _session
 
     def get_cookie(self, account=None, member_id=None):
         """获取指定账户的cookie"""
@@ -21,7 +33,7 @@ class LKPClient(object):
             params['linkedin_account'] = account
         if member_id:
             params['linkedin_member_id'] = member_id
-        response = requests.get(url, params=params, timeout=3*60).json()
+        response = orjson.loads(self.session.get(url, params=params, timeout=3*60).content)
         status = response.get('status')
         if status == 'success':
             data = response.get('data')
@@ -39,26 +51,35 @@ class LKPClient(object):
 
         return is_success, cookie, proxy, account_data, user_agent
 
-    def get_proxy_config(self, account):
+    def _account_lookup(self, account):
+        """查询账号信息，返回解码后的响应体；只缓存查询成功的结果，按账号缓存 ACCOUNT_CACHE_TTL 秒"""
+        cached = _account_cache.get(account)
+        if cached is not None:
+            return cached
         uri = '/api/linkedin-account/'
-        response = requests.get(urljoin(self.base_url, uri), params=dict(account=account), timeout=3*60)
-        response_data = response.json()
+        response = self.session.get(urljoin(self.base_url, uri), params=dict(account=account), timeout=3*60)
+        response_data = orjson.loads(response.content)
+        # 错误响应或查不到数据时不缓存，避免一次临时失败影响后续所有调用
+        data = response_data.get('data') if isinstance(response_data, dict) else response_data
+        if response.status_code != 200 or not data:
+            return response_data
+        _account_cache.set(account, response_data)
+        return response_data
+
+    def get_proxy_config(self, account):
+        response_data = self._account_lookup(account)
         return response_data[0] if response_data else []
 
     def get_account_id(self, account):
-        uri = '/api/linkedin-account/'
-        response = requests.get(urljoin(self.base_url, uri), params=dict(account=account), timeout=3*60)
-        response_data = response.json()
+        response_data = self._account_lookup(account)
         return response_data[0] if response_data else []
 
     def create_cookie(self, account, cookie_content):
-        uri = '/api/linkedin-account/'
-        account_response = requests.get(urljoin(self.base_url, uri), params=dict(account=account), timeout=3*60)
-        account_data = account_response.json().get('data')[0]
+        account_data = self._account_lookup(account).get('data')[0]
         account_id = account_data.get('id')
         uri = '/api/linkedin-cookies/'
         url = urljoin(self.base_url, uri)
-        response = requests.post(url, json=dict(
+        response = self.session.post(url, json=dict(
             account=account_id,
             cookie_content=cookie_content
         ))
@@ -0,0 +1,13 @@
+import logging
+
+
+class AccountLoggerAdapter(logging.LoggerAdapter):
+    """
+    给日志加上账号前缀，并把 account_id 写入 record.account_id
+
+    LoggerAdapter 会先判断日志级别再调用 process，被过滤掉的日志不会拼接前缀
+    """
+
+    def process(self, msg, kwargs):
+        kwargs['extra'] = {**self.extra, **kwargs.get('extra', {})}
+        return f"Account {self.extra['account_id']}: {msg}", kwargs
@@ -1,9 +1,9 @@
 import logging
 
+# 一次遍历同时转义 \n 和 \r
+_ESCAPE_TABLE = str.maketrans({'\n': '\\n', '\r': '\\r'})
+
 
 class EscapeNewlineFormatter(logging.Formatter):
     def format(self, record):
-        msg = super().format(record)
-        msg = msg.replace('\n', '\\n').replace('\r', '\\r')
-        return msg
-
+        return super().format(record).translate(_ESCAPE_TABLE)
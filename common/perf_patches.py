@@ -0,0 +1,56 @@
+"""
+进程级的性能补丁，需要在使用对应库之前调用
+"""
+import logging
+from http.client import HTTPConnection
+
+import orjson
+
+# http.client 默认的发送块大小（8KB），大文件上传时会产生大量小块写入
+HTTP_DEFAULT_BLOCKSIZE = 8192
+HTTP_BLOCKSIZE = 1024 * 1024
+
+
+def install_playwright_orjson():
+    """
+    把 Playwright driver 消息的 JSON 解码换成 orjson
+
+    Playwright 的每条 CDP 消息（包括 page.evaluate 的返回值）都要经过 Transport.deserialize_message，
+    这里替换的是私有实现，如果升级后接口变化则不打补丁，保持原样
+    """
+    try:
+        from playwright._impl._transport import Transport
+    except ImportError:
+        logging.warning('Playwright transport not found, skip orjson patch')
+        return False
+
+    original = getattr(Transport, 'deserialize_message', None)
+    if original is None or getattr(original, '_orjson_patched', False):
+        return False
+
+    def deserialize_message(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson 不支持的内容（例如超过 64 位的整数）交给原实现处理
+            return original(self, data)
+
+    deserialize_message._orjson_patched = True
+    Transport.deserialize_message = deserialize_message
+    return True
+
+
+def install_http_blocksize(blocksize=HTTP_BLOCKSIZE):
+    """
+    把 http.client.HTTPConnection 默认的发送块从 8KB 调大，上传 profile 压缩包时减少小块写入
+
+    修改的是整个进程所有 http.client 连接的默认参数（boto3/requests 底层的 urllib3 1.x 都基于它），
+    只在需要上传大文件的进程启动时调用；默认值已经被改过时不再重复修改
+    """
+    defaults = HTTPConnection.__init__.__defaults__
+    if not defaults or HTTP_DEFAULT_BLOCKSIZE not in defaults:
+        return False
+    HTTPConnection.__init__.__defaults__ = tuple(
+        blocksize if x == HTTP_DEFAULT_BLOCKSIZE else x for x in defaults
+    )
+    return True
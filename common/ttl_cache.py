@@ -0,0 +1,39 @@
+import threading
+import time
+
+
+class TTLCache:
+    """
+    进程内带过期时间的缓存，线程安全，用于对远程查询结果做短期缓存
+
+    超过 maxsize 时先清掉过期的条目，仍然满了就整体清空，避免无限增长
+    """
+
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """未命中或已过期时返回 default"""
+        with self._lock:
+            cached = self._data.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        return default
+
+    def set(self, key, value, ttl=None):
+        """写入缓存，ttl 为空时使用默认的过期时间"""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                for k in [k for k, v in self._data.items() if v[0] <= now]:
+                    del self._data[k]
+                if len(self._data) >= self.maxsize:
+                    self._data.clear()
+            self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
@@ -1,22 +1,49 @@
+import functools
 import logging
 import traceback
 
-import requests
+from common.http_session import build_session
 
+# 模块级复用的 Session，告警高峰时避免每条消息都重新握手
+_session = build_session(pool_connections=2, pool_maxsize=8)
 
-def send_wechat_message(content, key='a09786d5-604f-4f30-9fd6-63ea405279dd'):
-    try:
-        data = {
-            "msgtype": "text",
-            "text": {
-                "content": content
-            }
+# 企业微信接口超时时间，避免告警请求卡住调用方
+WECHAT_TIMEOUT = 5
+
+
+@functools.lru_cache(maxsize=8)
+def _webhook_url(key):
+    return f'https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key={key}'
+
+
+def _build_request(content, key):
+    """构造企业微信机器人文本消息的请求地址和请求体，同步/异步发送共用"""
+    data = {
+        "msgtype": "text",
+        "text": {
+            "content": content
         }
-        offline_job_url = 'https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key={}'.format(key)
+    }
+    return _webhook_url(key), data
+
 
-        requests.post(url=offline_job_url, json=data)
+def _log_send_error(e):
+    logging.error(f'发送企业微信机器人报错:{str(e)}')
+    logging.info(traceback.format_exc())
+
+
+def send_wechat_message(content, key='a09786d5-604f-4f30-9fd6-63ea405279dd'):
+    try:
+        url, data = _build_request(content, key)
+        _session.post(url=url, json=data, timeout=WECHAT_TIMEOUT)
     except Exception as e:
-        logging.error(f'发送企业微信机器人报错:{str(e)}')
-        logging.info(traceback.format_exc())
+        _log_send_error(e)
 
 
+async def send_wechat_message_async(client, content, key='a09786d5-604f-4f30-9fd6-63ea405279dd'):
+    """send_wechat_message 的异步版本，复用调用方的 httpx.AsyncClient，不占用线程池"""
+    try:
+        url, data = _build_request(content, key)
+        await client.post(url, json=data, timeout=WECHAT_TIMEOUT)
+    except Exception as e:
+        _log_send_error(e)
@@ -17,6 +17,7 @@ from pathlib import Path
 import sys
 
 import redis
+import redis.asyncio
 
 from common.env import is_prod_env, get_env
 from middlewares.silence_logging import SilenceLoggingFilter
@@ -195,6 +196,9 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'files/media')
 DomainName = os.environ.get('DomainName', '')
 
+# 好友/对话批量写库是否使用原生 SQL（execute_values + ON CONFLICT），设为 false 时回退到 ORM bulk_create
+RAW_SQL_BULK_WRITE = os.environ.get('RAW_SQL_BULK_WRITE', 'true').lower() == 'true'
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
@@ -321,4 +325,7 @@ class WechatRobotKey(str, Enum):
 # 配置 Redis 客户端
 redis_client = redis.StrictRedis(host=CACHE_HOST, port=6379, db=0)
 
+# 异步 Redis 客户端，供监听子进程在事件循环上直接调用（连接在首次使用时按事件循环创建）
+async_redis_client = redis.asyncio.StrictRedis(host=CACHE_HOST, port=6379, db=0)
+
 indeed_redis_client = redis.StrictRedis(host=CACHE_HOST, port=6379, db=2)
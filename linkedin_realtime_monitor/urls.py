@@ -31,14 +31,23 @@ def shutdownz(request):
         return HttpResponse('', status=400)
 
 
+# 版本文件内容按 mtime 缓存，文件没变时健康检查不再打开读取文件
+_VERSION_CACHE = {'mtime': None, 'content': '获取版本信息失败'}
+
+
 def healthz(request):
     version_check_file = os.path.join(settings.BASE_DIR, 'version_check.txt')
-    if os.path.exists(version_check_file):
-        with open(version_check_file, 'r') as f:
-            version_content = f.read()
-    else:
-        version_content = '获取版本信息失败'
-    return HttpResponse(version_content, status=200)
+    try:
+        mtime = os.path.getmtime(version_check_file)
+        if mtime != _VERSION_CACHE['mtime']:
+            with open(version_check_file, 'r') as f:
+                _VERSION_CACHE['content'] = f.read()
+            _VERSION_CACHE['mtime'] = mtime
+    except OSError:
+        _VERSION_CACHE['mtime'] = None
+        _VERSION_CACHE['content'] = '获取版本信息失败'
+    return HttpResponse(_VERSION_CACHE['content'], status=200)
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
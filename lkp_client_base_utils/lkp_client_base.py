@@ -1,17 +1,32 @@
 """纯粹的lkp-client"""
+import ast
 import datetime
-import json
 import logging
 import time
 
-import requests
-from urllib.parse import urljoin
+import httpx
+import orjson
 
+from common.http_session import build_session
 from middlewares.trace_id import generate_trace_id
 from .lkp_responses import GetCookieResponse, EscrowAccountResponse, RefreshCookieResponse, ReportActionResponse, \
     AccountInfoResponse, SubmitAuthCodeResponse, RefreshCookieTaskResponse, DeleteAccountResponse
 
 
+def _loads_proxy_payload(payload):
+    """
+    解析 LKP 代理接口返回的序列化数据
+
+    优先按 JSON 解析，失败时（Python 字面量，如 True/None/单引号）回退到 ast.literal_eval，不再使用 eval
+    """
+    if not isinstance(payload, (str, bytes)):
+        return payload
+    try:
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        return ast.literal_eval(payload if isinstance(payload, str) else payload.decode())
+
+
 class Account:
     def __init__(self, account, password):
         self.account = account
@@ -39,23 +54,45 @@ class Env(object):
     LOCAL = 'local'
 
 
+# 模块级复用的 Session，所有 LKPClientBase 实例共享同一个连接池
+_session = build_session()
+
+BASE_URLS = {
+    Env.PROD: 'https://lkp-v2.tuilink.io',
+    Env.STAGING: 'https://lkp-v2.staging.tuilink.io',
+    Env.LOCAL: 'http://192.168.163.49:8001/',
+}
+
+
+class _LKPUrls:
+    """按 base_url 预先拼好所有接口地址，避免每次调用都 urljoin"""
+
+    def __init__(self, base_url):
+        root = base_url.rstrip('/')
+        self.account = root + '/api/linkedin-account/'
+        self.account_detail = root + '/api/linkedin-account/{}/'
+        self.cookie = root + '/api/linkedin-account/cookie/'
+        self.refresh_task = root + '/api/refresh-cookie-task/'
+        self.refresh_task_detail = root + '/api/refresh-cookie-task/{}/'
+        self.proxy = {
+            'extended': root + '/api/action/proxy-extended-requests/',
+            'third_party': root + '/api/action/proxy-third-party-requests/',
+        }
+
+
 class LKPClientBase:
 
     def __init__(self, env=Env.STAGING):
         self.env = env
-        if self.env == Env.PROD:
-            self.base_url = 'https://lkp-v2.tuilink.io'
-        elif self.env == Env.STAGING:
-            self.base_url = 'https://lkp-v2.staging.tuilink.io'
-        elif self.env == Env.LOCAL:
-            self.base_url = 'http://192.168.163.49:8001/'
-        else:
+        self.session = _session
+        if self.env not in BASE_URLS:
             raise ValueError('Invalid env')
+        self.base_url = BASE_URLS[self.env]
+        self._urls = _LKPUrls(self.base_url)
 
     def create_account(self, account: Account, strict=False, source='lkrm'):
         # TODO:为了方便tuilink使用，设置里source的默认值，后续发展上， 不应该这么做
-        url = urljoin(self.base_url, '/api/linkedin-account/')
-        response = requests.post(url=url, json=dict(
+        response = self.session.post(url=self._urls.account, json=dict(
             account=account.account,
             password=account.password,
             source=source,
@@ -75,16 +112,13 @@ class LKPClientBase:
         """
         获取cookie
         """
-        uri = '/api/linkedin-account/cookie/'
-        url = urljoin(self.base_url, uri)
-        response = requests.get(url, params=dict(
+        response = self.session.get(self._urls.cookie, params=dict(
             linkedin_account=account,
         ), timeout=3*60)
         return GetCookieResponse(response)
 
     def update_account(self, account_id, account, password):
-        url = urljoin(self.base_url, '/api/linkedin-account/{}/'.format(account_id))
-        response = requests.put(url=url, json=dict(
+        response = self.session.put(url=self._urls.account_detail.format(account_id), json=dict(
             account=account,
             password=password,
         ), timeout=3*60)
@@ -111,41 +145,38 @@ class LKPClientBase:
             self.create_account(account)
 
     def get_account_info(self, account=None, member_id=None) -> AccountInfoResponse:
-        uri = '/api/linkedin-account/'
         if account:
             member_id = None
-        response = requests.get(urljoin(self.base_url, uri), params=dict(account=account, linkedin_member_id=member_id), timeout=3*60)
-        data = response.json().get('data')
+        response = self.session.get(self._urls.account, params=dict(account=account, linkedin_member_id=member_id), timeout=3*60)
+        # 响应体只解析一次，AccountInfoResponse 内部已缓存第一行
+        account_info = AccountInfoResponse(response)
+        data = account_info.data.get('data')
         logging.info(f'获取账号 {account} 信息, LKP 接口状态: {response.status_code}, data: {data}')
         if len(data) == 0:
             raise Exception('Please bind linkedin')
-        return AccountInfoResponse(response)
+        return account_info
 
     def report_action(self) -> ReportActionResponse:
         return ReportActionResponse({})
 
     def create_refresh_cookie_task(self, account) -> RefreshCookieResponse:
-        uri = '/api/refresh-cookie-task/'
-        url = urljoin(self.base_url, uri)
+        url = self._urls.refresh_task
         print('request {}'.format(url))
-        response = requests.post(url, json=dict(linkedin_account=account), timeout=3*60)
+        response = self.session.post(url, json=dict(linkedin_account=account), timeout=3*60)
         return RefreshCookieResponse(response)
 
     def submit_auth_code(self, task_id, auth_code) -> SubmitAuthCodeResponse:
-        uri = '/api/refresh-cookie-task/{}/'.format(task_id)
-        url = urljoin(self.base_url, uri)
-        response = requests.put(url, json=dict(auth_code=auth_code, status='auth code submitted'), timeout=3*60)
+        url = self._urls.refresh_task_detail.format(task_id)
+        response = self.session.put(url, json=dict(auth_code=auth_code, status='auth code submitted'), timeout=3*60)
         return SubmitAuthCodeResponse(response)
 
     def submit_app_confirm(self, task_id) -> SubmitAuthCodeResponse:
-        uri = '/api/refresh-cookie-task/{}/'.format(task_id)
-        url = urljoin(self.base_url, uri)
-        response = requests.put(url, json=dict(status='app confirmed'), timeout=3*60)
+        url = self._urls.refresh_task_detail.format(task_id)
+        response = self.session.put(url, json=dict(status='app confirmed'), timeout=3*60)
         return SubmitAuthCodeResponse(response)
 
     def get_refresh_task_info(self, task_id):
-        uri = '/api/refresh-cookie-task/{}/'.format(task_id)
-        response = requests.get(urljoin(self.base_url, uri), timeout=3*60)
+        response = self.session.get(self._urls.refresh_task_detail.format(task_id), timeout=3*60)
         return RefreshCookieTaskResponse(response)
 
     def delete_account(self, account=None, member_id=None):
@@ -153,9 +184,7 @@ class LKPClientBase:
             account_info = self.get_account_info(account=account, member_id=member_id)
             account_id = account_info.account_id
 
-            uri = '/api/linkedin-account/{}/'.format(account_id)
-            url = urljoin(self.base_url, uri)
-            response = requests.delete(url, timeout=3*60)
+            response = self.session.delete(self._urls.account_detail.format(account_id), timeout=3*60)
             return DeleteAccountResponse(response)
         except Exception as e:
             raise e
@@ -171,53 +200,154 @@ class LKPClientBase:
             logging.info(f'request lkp {only_id} get account info error here, error msg: {str(e)}')
             raise Exception('Get linkedin account info failed')
 
-        if category == 'extended':
-            uri = '/api/action/proxy-extended-requests/'
-            url = urljoin(self.base_url, uri)
-        elif category == 'third_party':
-            uri = '/api/action/proxy-third-party-requests/'
-            url = urljoin(self.base_url, uri)
-        else:
+        url = self._urls.proxy.get(category)
+        if url is None:
             raise Exception('invalid category')
         logging.info(f'request lkp {only_id} proxy request start here')
-        response = requests.post(url=url, json=dict(
-            linkedin_account=account_info.account_id,
-            method_name=method_name,
-            params=params,
-            enable_login=True,
-            source='LKRM',
-            description=f'{category} request {method_name}'
-        ), timeout=3*60)
-        if response.status_code != 201:
-            logging.info(f'request lkp {only_id} proxy request error here')
-            raise Exception('Request lkp proxy failed， status code {}'.format(response.status_code))
-        data = response.json()
-        status = data.get('response_status')
-        if status == ProxyRequestRecordStatus.SUCCESS:
-            result = data.get('response')
-            ret = eval(result)
-            if method_name == 'conversation_file':
-                ret = ret.get('content', None)
-                origin_ret = None
-                message = None
-            else:
-                ret = json.loads(ret.get('text'))
-                origin_ret = ret.get('origin_ret')
-                message = ret.get('message')
-            if origin_ret:
-                ret = eval(origin_ret)
-            if message == ProxyRequestRecordStatus.PROFILE_NOT_ACCESSED:
-                logging.info(f'request lkp {only_id} proxy request error here')
-                raise Exception(ProxyRequestRecordStatus.PROFILE_NOT_ACCESSED)
-            logging.info(f'request lkp {only_id} proxy request end here')
-            return ret
-        elif status == ProxyRequestRecordStatus.COOKIE_EXPIRED:
-            logging.info(f'request lkp {only_id} proxy request error here')
-            logging.info(f'{only_id}: {account} 账号绑定失效, 请重新托管')
-            raise Exception('Please bind LKP')
+        response = self.session.post(url=url, json=_proxy_request_body(account_info, category, method_name, params), timeout=3*60)
+        return _parse_proxy_response(only_id, account, method_name, response)
+
+
+def _proxy_request_body(account_info, category, method_name, params):
+    return dict(
+        linkedin_account=account_info.account_id,
+        method_name=method_name,
+        params=params,
+        enable_login=True,
+        source='LKRM',
+        description=f'{category} request {method_name}'
+    )
+
+
+def _parse_proxy_response(only_id, account, method_name, response):
+    """解析代理请求的响应，同步和异步客户端共用"""
+    if response.status_code != 201:
+        logging.info(f'request lkp {only_id} proxy request error here')
+        raise Exception('Request lkp proxy failed， status code {}'.format(response.status_code))
+    # 代理响应体（含 LinkedIn 原始数据）较大，直接对 bytes 用 orjson 解析
+    data = orjson.loads(response.content)
+    status = data.get('response_status')
+    if status == ProxyRequestRecordStatus.SUCCESS:
+        result = data.get('response')
+        ret = _loads_proxy_payload(result)
+        if method_name == 'conversation_file':
+            ret = ret.get('content', None)
+            origin_ret = None
+            message = None
         else:
+            ret = orjson.loads(ret.get('text'))
+            origin_ret = ret.get('origin_ret')
+            message = ret.get('message')
+        if origin_ret:
+            ret = _loads_proxy_payload(origin_ret)
+        if message == ProxyRequestRecordStatus.PROFILE_NOT_ACCESSED:
             logging.info(f'request lkp {only_id} proxy request error here')
-            raise Exception('something unexpected happened, data {}'.format(data))
+            raise Exception(ProxyRequestRecordStatus.PROFILE_NOT_ACCESSED)
+        logging.info(f'request lkp {only_id} proxy request end here')
+        return ret
+    elif status == ProxyRequestRecordStatus.COOKIE_EXPIRED:
+        logging.info(f'request lkp {only_id} proxy request error here')
+        logging.info(f'{only_id}: {account} 账号绑定失效, 请重新托管')
+        raise Exception('Please bind LKP')
+    else:
+        logging.info(f'request lkp {only_id} proxy request error here')
+        raise Exception('something unexpected happened, data {}'.format(data))
+
+
+_async_client = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    模块级复用的 httpx.AsyncClient，开启 HTTP/2，同一个进程内的并发请求复用一条 TCP 连接
+
+    注意：AsyncClient 绑定创建它的事件循环，每个 AccountMonitor 子进程只跑一个事件循环，所以可以共享
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            timeout=3*60,
+        )
+    return _async_client
+
+
+class AsyncLKPClientBase:
+    """
+    LKPClientBase 的异步版本，供 asyncio 代码直接 await，不再需要 run_in_executor 占用线程池
+
+    只实现了监控服务用到的接口，其余接口仍使用同步的 LKPClientBase
+    """
+
+    def __init__(self, env=Env.STAGING):
+        self.env = env
+        if self.env not in BASE_URLS:
+            raise ValueError('Invalid env')
+        self.base_url = BASE_URLS[self.env]
+        self._urls = _LKPUrls(self.base_url)
+        self.client = get_async_client()
+
+    async def get_cookie(self, account: str) -> GetCookieResponse:
+        response = await self.client.get(self._urls.cookie, params=dict(linkedin_account=account))
+        return GetCookieResponse(response)
+
+    async def get_account_info(self, account=None, member_id=None) -> AccountInfoResponse:
+        if account:
+            member_id = None
+        # httpx 会把 None 编码成空字符串，这里手动去掉，和 requests 的行为保持一致
+        params = {k: v for k, v in dict(account=account, linkedin_member_id=member_id).items() if v is not None}
+        response = await self.client.get(self._urls.account, params=params)
+        account_info = AccountInfoResponse(response)
+        data = account_info.data.get('data')
+        logging.info(f'获取账号 {account} 信息, LKP 接口状态: {response.status_code}, data: {data}')
+        if len(data) == 0:
+            raise Exception('Please bind linkedin')
+        return account_info
+
+    async def update_account(self, account_id, account, password):
+        response = await self.client.put(self._urls.account_detail.format(account_id), json=dict(account=account, password=password))
+        return response.status_code == 200, response.json()
+
+    async def create_refresh_cookie_task(self, account) -> RefreshCookieResponse:
+        response = await self.client.post(self._urls.refresh_task, json=dict(linkedin_account=account))
+        return RefreshCookieResponse(response)
+
+    async def get_refresh_task_info(self, task_id):
+        response = await self.client.get(self._urls.refresh_task_detail.format(task_id))
+        return RefreshCookieTaskResponse(response)
+
+    async def escrow_account(self, account: Account, member_id=None):
+        """托管账户，依赖 account_id 的调用链必须串行，这里只是不再阻塞事件循环"""
+        account_info = await self.get_account_info(account=account.account, member_id=member_id)
+        is_success, data = await self.update_account(account_id=account_info.account_id,
+                                                      account=account.account,
+                                                      password=account.password)
+        if not is_success:
+            logging.error('修改账号信息失败')
+            return
+        ret = await self.create_refresh_cookie_task(account.account)
+        return EscrowAccountResponse(ret.task_id)
+
+    async def delete_account(self, account=None, member_id=None):
+        account_info = await self.get_account_info(account=account, member_id=member_id)
+        response = await self.client.delete(self._urls.account_detail.format(account_info.account_id))
+        return DeleteAccountResponse(response)
+
+    async def make_a_linked_in_request(self, account, category, method_name, params, member_id=None):
+        only_id = generate_trace_id()
+        logging.info(f'request lkp {only_id} 请求参数: {params}, method_name: {method_name}, account: {account}, category: {category}')
+        url = self._urls.proxy.get(category)
+        if url is None:
+            raise Exception('invalid category')
+        try:
+            account_info = await self.get_account_info(account=account, member_id=member_id)
+        except Exception as e:
+            logging.info(f'request lkp {only_id} get account info error here, error msg: {str(e)}')
+            raise Exception('Get linkedin account info failed')
+        logging.info(f'request lkp {only_id} proxy request start here')
+        response = await self.client.post(url, json=_proxy_request_body(account_info, category, method_name, params))
+        return _parse_proxy_response(only_id, account, method_name, response)
 
 
 class ProxyRequestRecordStatus:
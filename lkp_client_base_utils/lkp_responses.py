@@ -1,4 +1,6 @@
-import json
+from functools import cached_property
+
+import orjson
 
 
 class LKPResponse(object):
@@ -9,21 +11,26 @@ class LKPResponse(object):
     def __init__(self, http_response):
         self.http_response = http_response
         try:
-            self.data = json.loads(http_response.text)
-        except json.JSONDecodeError:
+            # 直接解析 bytes，省去 response.text 的解码
+            self.data = orjson.loads(http_response.content)
+        except orjson.JSONDecodeError:
             self.data = {}
+        # 列表型接口只关心第一行，解析一次后缓存；_has_rows 区分"没有数据"和"第一行为空"
+        rows = self.data.get('data') if isinstance(self.data, dict) else None
+        self._has_rows = isinstance(rows, list) and len(rows) > 0
+        self._first = rows[0] if self._has_rows else {}
 
 
 class GetCookieResponse(LKPResponse):
 
-    @property
+    @cached_property
     def status(self):
         if not self.cookie:
             return LKPResponse.STATUS.FAIL
         status = self.data.get('status')
         return status
 
-    @property
+    @cached_property
     def cookie(self):
         cookie = self.data.get('data', {}).get('cookie')
         return cookie
@@ -36,12 +43,12 @@ class EscrowAccountResponse():
 
 class RefreshCookieResponse(LKPResponse):
 
-    @property
+    @cached_property
     def task_id(self):
         task_id = self.data.get('data', {}).get('id')
         return task_id
 
-    @property
+    @cached_property
     def status(self):
         status = self.data.get('status')
         return status
@@ -54,7 +61,7 @@ class ReportActionResponse(LKPResponse):
 
     ALL_STATUS = [STATUS.SUCCESS, STATUS.FAIL]
 
-    @property
+    @cached_property
     def status(self):
         status = self.data.get('status')
         # 做一些对于服务端的强制校验，防止一些意外情况发生， 对其他子系统造成影响
@@ -70,7 +77,7 @@ class SubmitAuthCodeResponse(LKPResponse):
 
     ALL_STATUS = [STATUS.SUCCESS, STATUS.FAIL]
 
-    @property
+    @cached_property
     def status(self):
         status = self.data.get('status')
         # 做一些对于服务端的强制校验，防止一些意外情况发生， 对其他子系统造成影响
@@ -86,23 +93,23 @@ class AccountInfoResponse(LKPResponse):
 
     ALL_STATUS = [STATUS.SUCCESS, STATUS.FAIL]
 
-    @property
-    def proxy_url(self):
-        data = self.data.get('data', [])
-        if len(data) == 0:
+    def _field(self, key, default=None):
+        # 没有账号数据时返回 None；有数据但第一行为空时返回 default，和原来的行为一致
+        if not self._has_rows:
             return None
-        d = data[0]
-        return d.get('proxy_url', False)
+        if not self._first:
+            return default
+        return self._first.get(key, default)
+
+    @cached_property
+    def proxy_url(self):
+        return self._field('proxy_url', False)
 
-    @property
+    @cached_property
     def is_cookie_valid(self):
-        data = self.data.get('data', [])
-        if len(data) == 0:
-            return None
-        d = data[0]
-        return d.get('is_cookie_valid', False)
+        return self._field('is_cookie_valid', False)
 
-    @property
+    @cached_property
     def status(self):
         status = self.data.get('status')
         # 做一些对于服务端的强制校验，防止一些意外情况发生， 对其他子系统造成影响
@@ -110,31 +117,17 @@ class AccountInfoResponse(LKPResponse):
             raise ValueError(f'Invalid status: {status}')
         return status
 
-    @property
+    @cached_property
     def two_step_auth_enabled(self):
-        data = self.data.get('data', [])
-        if len(data) == 0:
-            return None
-        d = data[0]
-        return d.get('two_step_auth_enabled', False)
+        return self._field('two_step_auth_enabled', False)
 
-    @property
+    @cached_property
     def account_id(self):
-        data = self.data.get('data', [])
-        if len(data) == 0:
-            return None
-        d = data[0]
-        account_id = d.get('id')
-        return account_id
+        return self._field('id')
 
-    @property
+    @cached_property
     def authenticator_secret_key(self):
-        data = self.data.get('data', [])
-        if len(data) == 0:
-            return None
-        d = data[0]
-        authenticator_secret_key = d.get('authenticator_secret_key')
-        return authenticator_secret_key
+        return self._field('authenticator_secret_key')
 
 
 class RefreshCookieTaskResponse(LKPResponse):
@@ -156,46 +149,42 @@ class RefreshCookieTaskResponse(LKPResponse):
         ACCOUNT_CHALLENGED = 'account challenged'
         INTERRUPTED = 'interrupted'
 
-    @property
+    # 原始状态到对外状态的映射，在类定义时构建一次
+    _STATUS_MAP = {
+        'account challenged': STATUS.ACCOUNT_CHALLENGED,
+        'auth code submitted': STATUS.AUTH_CODE_SUBMITTED,
+        'app confirmed': STATUS.APP_CONFIRMED,
+        'success': STATUS.SUCCESS,
+        'auth code error': STATUS.AUTH_CODE_ERROR,
+        'account or password error': STATUS.ACCOUNT_OR_PASSWORD_ERROR,
+        'timeout error': STATUS.TIMEOUT_ERROR,
+        'failed': STATUS.FAIL,
+        'system overload': STATUS.SYSTEM_OVERLOAD,
+        'created': STATUS.RUNNING,
+        'interrupted': STATUS.INTERRUPTED,
+    }
+    # 等待提交验证码时，根据二步验证类型映射到对应的状态
+    _TWO_STEP_MAP = {
+        'sms': STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_SMS,
+        'email': STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_EMAIL,
+        'authenticator': STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_AUTHENTICATOR,
+        'linkedin app': STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_APP,
+    }
+
+    @cached_property
     def status(self):
         two_step_auth_type = self.data.get('data', {}).get('two_step_auth_type')
         raw_status = self.data.get('data', {}).get('status')
-        # 这里相当于是根据状态和二步验证类型映射到对应的状态
+        try:
+            return self._STATUS_MAP[raw_status]
+        except KeyError:
+            pass
         if raw_status == 'waiting for submitting auth code' and two_step_auth_type:
-            if two_step_auth_type == 'sms':
-                return self.STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_SMS
-            elif two_step_auth_type == 'email':
-                return self.STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_EMAIL
-            elif two_step_auth_type == 'authenticator':
-                return self.STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_AUTHENTICATOR
-            elif two_step_auth_type == 'linkedin app':
-                return self.STATUS.WAITING_FOR_SUBMIT_AUTH_FOR_APP
-            else:
+            try:
+                return self._TWO_STEP_MAP[two_step_auth_type]
+            except KeyError:
                 raise ValueError(f'Invalid two_step_auth_type: {two_step_auth_type}')
-        elif raw_status == 'account challenged':
-            return self.STATUS.ACCOUNT_CHALLENGED
-        elif raw_status == 'auth code submitted':
-            return self.STATUS.AUTH_CODE_SUBMITTED
-        elif raw_status == 'app confirmed':
-            return self.STATUS.APP_CONFIRMED
-        elif raw_status == 'success':
-            return self.STATUS.SUCCESS
-        elif raw_status == 'auth code error':
-            return self.STATUS.AUTH_CODE_ERROR
-        elif raw_status == 'account or password error':
-            return self.STATUS.ACCOUNT_OR_PASSWORD_ERROR
-        elif raw_status == 'timeout error':
-            return self.STATUS.TIMEOUT_ERROR
-        elif raw_status == 'failed':
-            return self.STATUS.FAIL
-        elif raw_status == 'system overload':
-            return self.STATUS.SYSTEM_OVERLOAD
-        elif raw_status == 'created':
-            return self.STATUS.RUNNING
-        elif raw_status == 'interrupted':
-            return self.STATUS.INTERRUPTED
-        else:
-            raise ValueError(f'Invalid raw_status: {raw_status} or two_step_auth_type: {two_step_auth_type}')
+        raise ValueError(f'Invalid raw_status: {raw_status} or two_step_auth_type: {two_step_auth_type}')
 
     def task_id(self):
         return self.data.get('data', {}).get('id')
@@ -203,7 +192,7 @@ class RefreshCookieTaskResponse(LKPResponse):
 
 class DeleteAccountResponse(LKPResponse):
 
-    @property
+    @cached_property
     def status(self):
         if self.http_response.status_code == 200:
             return self.STATUS.SUCCESS
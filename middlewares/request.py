@@ -1,58 +1,88 @@
-import json
 import logging
 
+import orjson
+
 MAX_RESPONSE_CONTENT_LENGTH = 1000
 
+# 不记录请求/响应日志的路径：健康检查调用频繁且没有排查价值
+SKIP_LOGGING_PATHS = ('/healthz', '/shutdownz')
 
-def parse_request_body(request, include_file=False):
-    body = None
 
-    # For POST/PUT/PATCH requests, parse the request body depending on content type
-    if request.method in ["POST", "PUT", "PATCH"]:
-        # Handle application/json
-        if request.content_type == 'application/json':
-            try:
-                body = json.loads(request.body)
-            except json.JSONDecodeError:
-                body = "Invalid JSON: %s" % request.body
-
-        # Handle application/x-www-form-urlencoded
-        elif request.content_type == 'application/x-www-form-urlencoded':
-            body = request.POST
-        elif request.content_type.startswith('multipart/form-data'):
-            # Add non-file key-value pairs
-            body = {k: v for k, v in request.POST.items()}
-
-            # Add file key-value pairs
-            if include_file:
-                for k, v in request.FILES.items():
-                    body[k] = str(v)
-
-        # Handle text/plain
-        elif request.content_type == 'text/plain':
-            try:
-                body = dict(line.split('=', 1)
-                            for line in request.body.decode().splitlines())
-            except ValueError:
-                body = "Invalid text/plain format: %s" % request.body.decode()
-
-        # Unknown content types
-        else:
-            # Handle other content types
-            body = "Unsupported content type: %s" % request.content_type
-    else:
-        # For other HTTP methods, access GET parameters with request.GET
-        body = request.GET
+def _parse_json(request, include_file):
+    try:
+        return orjson.loads(request.body)
+    except orjson.JSONDecodeError:
+        return "Invalid JSON: %s" % request.body
+
+
+def _parse_form(request, include_file):
+    return request.POST
 
+
+def _parse_multipart(request, include_file):
+    # Add non-file key-value pairs
+    body = {k: v for k, v in request.POST.items()}
+
+    # Add file key-value pairs, only name and size, never the file content
+    if include_file:
+        for k, v in request.FILES.items():
+            body[k] = f'{v.name} ({v.size} bytes)'
     return body
 
 
+def _parse_text_plain(request, include_file):
+    try:
+        return dict(line.split('=', 1)
+                    for line in request.body.decode().splitlines())
+    except ValueError:
+        return "Invalid text/plain format: %s" % request.body.decode()
+
+
+# content-type 到解析函数的映射，multipart 带 boundary 参数，单独按前缀判断
+_BODY_PARSERS = {
+    'application/json': _parse_json,
+    'application/x-www-form-urlencoded': _parse_form,
+    'text/plain': _parse_text_plain,
+}
+
+
+def parse_request_body(request, include_file=False):
+    # For other HTTP methods, access GET parameters with request.GET
+    if request.method not in ("POST", "PUT", "PATCH"):
+        return request.GET
+
+    # For POST/PUT/PATCH requests, parse the request body depending on content type
+    content_type = request.content_type
+    parser = _BODY_PARSERS.get(content_type)
+    if parser is not None:
+        return parser(request, include_file)
+    if content_type.startswith('multipart/form-data'):
+        return _parse_multipart(request, include_file)
+    return "Unsupported content type: %s" % content_type
+
+
+def _response_content_for_log(response):
+    # 流式响应没有 content，读取会消费掉迭代器
+    if getattr(response, 'streaming', False):
+        return b'<streaming response>'
+    content_length = response.get('Content-Length')
+    length = int(content_length) if content_length else len(response.content)
+    if length >= MAX_RESPONSE_CONTENT_LENGTH:
+        return response.content[:MAX_RESPONSE_CONTENT_LENGTH] + b'... (truncated)'
+    return response.content
+
+
 class RequestMiddleware:
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
+        # SilenceLoggingMiddleware 排在本中间件之后，这里同时按路径判断 Selenium 请求
+        if getattr(request, 'is_silence_log', False) or '/session/' in request.path \
+                or request.path in SKIP_LOGGING_PATHS:
+            return self.get_response(request)
+
         # Log request
         logging.info(
             "Request: method=%s; path=%s; body=%s",
@@ -67,8 +97,7 @@ class RequestMiddleware:
         logging.info(
             "Response: status_code=%s; content=%s",
             response.status_code,
-            response.content[:MAX_RESPONSE_CONTENT_LENGTH] + b'... (truncated)' if len(
-                response.content) >= MAX_RESPONSE_CONTENT_LENGTH else response.content,
+            _response_content_for_log(response),
         )
 
         return response
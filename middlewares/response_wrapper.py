@@ -1,4 +1,4 @@
-import json
+import orjson
 from django.utils.deprecation import MiddlewareMixin
 
 
@@ -15,12 +15,19 @@ class CampaignManagerResponseWrapperMiddleware(MiddlewareMixin):
             content_type = response.get("Content-Type", "")
             if "application/json" in content_type:
                 try:
+                    body = response.content
+                    # 上游已经是合法的 JSON 对象/数组，直接拼接字节，省去一次解析和序列化
+                    if body.lstrip()[:1] in (b'{', b'['):
+                        response.content = b'{"data":' + body + b'}'
+                        response["Content-Length"] = str(len(response.content))
+                        return response
+
                     # 解码原始数据
-                    data = json.loads(response.content)
+                    data = orjson.loads(body)
 
                     # 包装成 {"data": original_data}
                     wrapped_data = {"data": data}
-                    response.content = json.dumps(wrapped_data)
+                    response.content = orjson.dumps(wrapped_data)
                     response["Content-Length"] = str(len(response.content))
 
                 except Exception as e:
@@ -1,27 +1,27 @@
+import os
 import uuid
 import logging
-from threading import local
+from contextvars import ContextVar
 
-_thread_locals = local()
+# 每个线程 / asyncio Task 各自持有一份 trace_id，协程之间互不覆盖
+_trace_id_var = ContextVar('trace_id', default=None)
 
 
 # Set the trace ID
 def set_trace_id(trace_id=None):
-    if trace_id:
-        _thread_locals.trace_id = trace_id
-    else:
-        _thread_locals.trace_id = generate_trace_id()
+    _trace_id_var.set(trace_id or generate_trace_id())
 
 
-# Generate a UUID-based random trace ID
+# Generate a random hex trace ID; a full UUID string only when no length limit is given
 def generate_trace_id(max_length=8):
-    id = str(uuid.uuid4())
-    return id if max_length is None else id[:max_length]
+    if max_length is None:
+        return str(uuid.uuid4())
+    return os.urandom((max_length + 1) // 2).hex()[:max_length]
 
 
-# Get the current trace ID from the thread local variables
+# Get the current trace ID from the current context
 def get_current_trace_id():
-    return getattr(_thread_locals, "trace_id", None)
+    return _trace_id_var.get()
 
 
 # Middelware for adding trace ID to the thread
@@ -31,7 +31,7 @@ class TraceIDMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        _thread_locals.trace_id = generate_trace_id()
+        set_trace_id()
         response = self.get_response(request)
         return response
 
@@ -41,4 +41,7 @@ class TraceIDFilter(logging.Filter):
 
     def filter(self, record):
         record.trace_id = get_current_trace_id()
+        # AccountLoggerAdapter 会写入 account_id，其余日志补默认值，方便格式化时引用
+        if not hasattr(record, 'account_id'):
+            record.account_id = None
         return True
@@ -1,12 +1,12 @@
 import asyncio
+import heapq
+import json
 import logging
 import os
 import random
 import sys
-import re
 import time
 from typing import Optional
-from asgiref.sync import sync_to_async
 
 import django
 
@@ -23,6 +23,109 @@ from realtime_monitor.core.event_handler import EventHandler
 from realtime_monitor.core.db_health_check import db_health_checker
 from realtime_monitor.models import MonitorAccount
 from middlewares.trace_id import get_current_trace_id
+from common.log_handle.account_log_adapter import AccountLoggerAdapter
+from linkedin_realtime_monitor.settings import async_redis_client
+
+# 心跳写入 Redis（值为 time.time()），主进程健康检查用一次 MGET 读取所有账号的心跳
+HEARTBEAT_KEY = 'monitor:hb:{}'
+HEARTBEAT_TTL = 600
+
+# 红点检查的页面内辅助函数，每次页面加载时注入一次，挂在 window.__bm 上
+BADGE_HELPERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'js', 'badge_helpers.js')
+with open(BADGE_HELPERS_PATH, encoding='utf-8') as _f:
+    BADGE_HELPERS_SCRIPT = _f.read()
+
+# 页面加载时注入的常驻 MutationObserver，只观察红点所在的顶部导航栏和消息浮窗 header，
+# 红点变化时（防抖后）把检查结果推送给 Python，替代每秒轮询；目标节点未渲染或被整体替换时定期重新挂载。
+# 依赖先注入的 BADGE_HELPERS_SCRIPT
+BADGE_OBSERVER_SCRIPT = """
+(() => {
+    if (window !== window.top || !window.__bm) return;
+    const xpaths = %(xpaths)s;
+    const targetSelectors = %(target_selectors)s;
+    const observed = new Map();
+    const observer = new MutationObserver(schedule);
+    let lastSignature = null;
+    let timer = null;
+
+    function report() {
+        timer = null;
+        const results = window.__bm.findBadges(xpaths, %(debug)s);
+        // 只有红点数量变化时才通知 Python
+        const signature = Object.keys(results).map(key => key + ':' + results[key].count).join('|');
+        if (signature === lastSignature) return;
+        lastSignature = signature;
+        if (window.onBadgeChange) window.onBadgeChange(results);
+    }
+
+    // 防抖：每次变化都重新计时，变化停止 debounce_ms 后才检查一次
+    function schedule() {
+        clearTimeout(timer);
+        timer = setTimeout(report, %(debounce_ms)d);
+    }
+
+    // 目标节点有变化（首次渲染或被整体替换）时重新挂载 observer
+    function attach() {
+        let changed = false;
+        for (const selector of targetSelectors) {
+            const element = document.querySelector(selector);
+            if (element !== (observed.get(selector) || null)) {
+                observed.set(selector, element);
+                changed = true;
+            }
+        }
+        if (!changed) return;
+        observer.disconnect();
+        for (const element of observed.values()) {
+            if (!element) continue;
+            observer.observe(element, {
+                childList: true,
+                characterData: true,
+                subtree: true,
+                attributes: true,
+                attributeFilter: ['class', 'style', 'hidden']
+            });
+        }
+        schedule();
+    }
+
+    function start() {
+        attach();
+        setInterval(attach, %(reattach_ms)d);
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start);
+    } else {
+        start();
+    }
+})();
+"""
+
+# 调用页面中已注入的检查函数，未注入时返回 null
+CALL_FIND_BADGES_SCRIPT = "(args) => window.__bm ? window.__bm.findBadges(args.xpaths, args.debug) : null"
+
+# 子进程级共享的 Playwright driver，多次创建 AccountMonitor / 重启浏览器时不再重复拉起 node 进程
+_playwright = None
+_playwright_lock = asyncio.Lock()
+
+
+async def get_playwright():
+    """懒加载并缓存 Playwright driver"""
+    global _playwright
+    async with _playwright_lock:
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+        return _playwright
+
+
+async def stop_playwright():
+    """进程退出前调用，关闭共享的 Playwright driver"""
+    global _playwright
+    async with _playwright_lock:
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
 
 
 class AccountMonitor:
@@ -34,8 +137,38 @@ class AccountMonitor:
         'messaging': '//*[@id="msg-overlay"]/div[1]/header/div[2]/mark'
     }
 
+    # MutationObserver 观察的节点：顶部导航栏（人脉红点）和消息浮窗 header（消息红点）
+    BADGE_OBSERVER_TARGETS = ['#global-nav', '#msg-overlay > div:first-child > header']
+    # MutationObserver 防抖时间（毫秒）
+    BADGE_OBSERVER_DEBOUNCE_MS = 500
+    # 检查观察节点是否被替换、需要重新挂载的间隔（毫秒）
+    BADGE_OBSERVER_REATTACH_MS = 5000
+    # 兜底轮询间隔（秒），防止页面整体重建后 observer 漏报；
+    # 红点状态变化后从最小间隔开始，连续没有变化时指数退避到最大间隔
+    DOM_POLL_MIN_INTERVAL = 1
+    DOM_POLL_INTERVAL = 30
+    # 每检查多少次输出一次汇总日志
+    DOM_SUMMARY_LOG_EVERY = 60
+    # 定时任务及其执行间隔（秒）
+    SCHEDULED_JOBS = {
+        'heartbeat': 30,
+        'enabled_check': 10,
+        'fallback': 300,
+    }
+    # 每隔多少次心跳把心跳时间同步到数据库 last_heartbeat_at（Redis 心跳丢失时主进程用它兜底）
+    HEARTBEAT_DB_EVERY = 5
+
     def __init__(self, account_id: str):
         self.account_id = account_id
+        self._account_pk = int(account_id)
+        self._heartbeat_count = 0
+        self.log = AccountLoggerAdapter(logging.getLogger(__name__), {'account_id': account_id})
+        # init_browser 时缓存，用于日志，避免再查一次数据库
+        self._account_email: Optional[str] = None
+        self._user_data_dir: Optional[str] = None
+        # observer 推送过来的红点检查结果
+        self._badge_queue: asyncio.Queue = asyncio.Queue()
+        self._fallback_task: Optional[asyncio.Task] = None
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
         self.playwright = None
@@ -46,7 +179,7 @@ class AccountMonitor:
         """运行监听器"""
         # 获取当前 trace_id（已在子进程启动时设置）
         trace_id = get_current_trace_id()
-        logging.info(f"AccountMonitor starting for account {self.account_id} with trace_id: {trace_id}")
+        self.log.info("AccountMonitor starting with trace_id: %s", trace_id)
 
         try:
             # 1. 初始化浏览器
@@ -54,24 +187,22 @@ class AccountMonitor:
 
             # 2. 检查登录状态
             if not await self.check_login():
-                logging.error(f"Account {self.account_id} not logged in")
+                self.log.error("not logged in")
                 await self._mark_account_error("Login check failed")
                 return
 
             # 3. 启动监听循环
             self.is_running = True
 
-            # 并发运行五个任务（包括浏览器健康检查）
-            await asyncio.gather(
-                self.dom_monitor_loop(),
-                self.fallback_polling_loop(),
-                self.heartbeat_loop(),
-                self.monitor_enabled_check_loop()
-            )
+            # 并发运行 DOM 监听和定时任务两个协程，任一协程异常退出时自动取消另一个
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self.dom_monitor_loop())
+                tg.create_task(self.scheduler_loop())
 
-        except Exception as e:
-            error_msg = f"AccountMonitor fatal error: {str(e)}"
-            logging.error(f"AccountMonitor error for account {self.account_id}: {error_msg}", exc_info=True)
+        except* Exception as eg:
+            self.is_running = False
+            error_msg = f"AccountMonitor fatal error: {'; '.join(str(e) for e in eg.exceptions)}"
+            self.log.error("AccountMonitor error: %s", error_msg, exc_info=eg)
             await self._mark_account_error(error_msg)
         finally:
             await self.cleanup()
@@ -83,14 +214,15 @@ class AccountMonitor:
             raise Exception("Database connection not available")
         
         # 获取账号配置
-        account = await MonitorAccount.objects.aget(id=int(self.account_id))
+        account = await MonitorAccount.objects.aget(id=self._account_pk)
+        self._account_email = account.email
+        self._user_data_dir = f'./chrome_profile_dir/{account.email}'
 
-        self.playwright = await async_playwright().start()
+        self.playwright = await get_playwright()
 
         # 启动浏览器（使用持久化 Profile）
-        user_data_dir = f'./chrome_profile_dir/{account.email}'
         self.browser = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=user_data_dir,
+            user_data_dir=self._user_data_dir,
             headless=False,  # 生产环境使用无头模式
             channel="chrome",
             args=[
@@ -110,10 +242,21 @@ class AccountMonitor:
         else:
             self.page = await self.browser.new_page()
 
-        # 导航到 LinkedIn Feed 页面
-        await self.page.goto('https://www.linkedin.com/feed/', timeout=60000)
+        # 安装红点 observer，之后每次导航都会自动注入
+        await self.page.expose_binding('onBadgeChange', self._on_badge_change)
+        await self.page.add_init_script(path=BADGE_HELPERS_PATH)
+        await self.page.add_init_script(script=BADGE_OBSERVER_SCRIPT % {
+            'xpaths': json.dumps(self.XPATHS),
+            'target_selectors': json.dumps(self.BADGE_OBSERVER_TARGETS),
+            'debounce_ms': self.BADGE_OBSERVER_DEBOUNCE_MS,
+            'reattach_ms': self.BADGE_OBSERVER_REATTACH_MS,
+            'debug': json.dumps(logging.getLogger().isEnabledFor(logging.DEBUG)),
+        })
 
-        logging.info(f"Browser initialized for {self.account_id}")
+        # 导航到 LinkedIn Feed 页面，DOM 解析完成即返回（check_login 紧接着依赖这个状态）
+        await self.page.goto('https://www.linkedin.com/feed/', wait_until='domcontentloaded', timeout=60000)
+
+        self.log.info("Browser initialized")
 
     async def check_login(self) -> bool:
         """检查是否已登录
@@ -122,39 +265,58 @@ class AccountMonitor:
             bool: 如果已登录返回 True，否则返回 False
         """
         try:
-            # 1. 等待页面加载完成
-            await self.page.wait_for_load_state('domcontentloaded', timeout=10000)
-
-            # 2. 再等待一点时间，确保 JavaScript 执行完成
+            # 1. init_browser 的 goto 已经等到 domcontentloaded，再等待一点时间，确保 JavaScript 执行完成
             await asyncio.sleep(5)
 
-            # 3. 检查是否在登录页面
+            # 2. 检查是否在登录页面
             current_url = self.page.url
             if 'login' in current_url or 'challenge' in current_url:
-                logging.info(f"Currently on login page: {current_url}")
+                self.log.info("Currently on login page: %s", current_url)
                 return False
             return True
 
         except asyncio.TimeoutError:
-            logging.error("Login check timeout - page load took too long")
+            self.log.error("Login check timeout - page load took too long")
             return False
         except Exception as e:
-            logging.error(f"Login check error: {type(e).__name__}: {e}")
+            self.log.error("Login check error: %s: %s", type(e).__name__, e)
             return False
 
     async def dom_monitor_loop(self):
-        """DOM 红点监听循环"""
-        logging.info(f"DOM monitor loop started for {self.account_id}")
+        """DOM 红点监听循环：消费 observer 推送的结果，超时没有推送时主动检查一次兜底"""
+        self.log.info("DOM monitor loop started")
 
         last_states = {key: False for key in self.XPATHS}
-        loop_count = 0  # 循环计数器，用于控制页面刷新
+        loop_count = 0  # 循环计数器，用于定期输出汇总日志
+        # 连续没有状态变化的次数，用于计算兜底轮询间隔；启动时由 observer 负责，直接从最大间隔开始
+        unchanged = 5
 
         while self.is_running:
             try:
-                for key in self.XPATHS.keys():
-                    current_state, badge_count = await self.check_red_badge(key)
-                    logging.info(
-                        f"Account {self.account_id}: {key} state: {current_state} last_state: {last_states[key]} badge_count: {badge_count}")
+                poll_interval = min(self.DOM_POLL_INTERVAL, self.DOM_POLL_MIN_INTERVAL * (1 << min(unchanged, 5)))
+                try:
+                    results = await asyncio.wait_for(self._badge_queue.get(), timeout=poll_interval)
+                    # 上一次处理（抓取）期间积压的快照只保留最新的一份
+                    while results is not None and not self._badge_queue.empty():
+                        results = self._badge_queue.get_nowait()
+                    if results is None:
+                        # _stop() 放入的唤醒信号
+                        continue
+                    badges = self._parse_badge_results(results)
+                except asyncio.TimeoutError:
+                    # 抓取清除红点时页面不在 Feed，此时的红点状态不可信，等回到 Feed 后再检查
+                    if self.event_handler.crawler.off_feed:
+                        continue
+                    badges = await self.check_red_badges()
+                loop_count += 1
+                changed = any(state != last_states[key] for key, (state, _) in badges.items())
+                unchanged = 0 if changed else unchanged + 1
+                for key, (current_state, badge_count) in badges.items():
+                    # 只在状态变化时输出 info 日志，其余降级为 debug
+                    level = logging.INFO if current_state != last_states[key] else logging.DEBUG
+                    self.log.log(
+                        level,
+                        "%s state: %s last_state: %s badge_count: %s", key, current_state, last_states[key], badge_count)
                     # 从无到有：触发高优先级事件
                     if current_state and not last_states[key]:
                         await self.trigger_event(
@@ -164,365 +326,185 @@ class AccountMonitor:
                             badge_count=badge_count
                         )
                     last_states[key] = current_state
-                    await asyncio.sleep(1)  # 每秒检查一次
+                if loop_count % self.DOM_SUMMARY_LOG_EVERY == 0:
+                    self.log.info("DOM monitor alive, checks=%s, states=%s", loop_count, last_states)
 
             except Exception as e:
                 # 检查是否是浏览器关闭导致的异常
-                if "Target closed" in str(e) or "Browser closed" in str(e) or "Connection closed" in str(e):
-                    logging.error(f"Account {self.account_id}: Browser closed unexpectedly in DOM monitor: {e}")
-                    await self._mark_account_error(f"Browser closed in DOM monitor: {str(e)}")
-                    self.is_running = False
+                if await self._handle_browser_closed(e, 'DOM monitor'):
                     break
-                logging.error(f"DOM monitor error: {e}", exc_info=True)
+                self.log.error("DOM monitor error: %s", e, exc_info=True)
                 await asyncio.sleep(5)
 
-    async def fallback_polling_loop(self):
-        """Fallback 轮训循环"""
-        logging.info(f"Fallback polling loop started for {self.account_id}")
+    async def scheduler_loop(self):
+        """定时任务循环：心跳、enable 状态检查、fallback 轮询共用一个协程，按最近的截止时间依次执行"""
+        self.log.info("Scheduler loop started")
+
+        # 启动后立即写一次心跳（同时写数据库），不等第一个心跳间隔
+        await self._heartbeat_job()
+
+        now = time.monotonic()
+        jobs = [(now + interval, name) for name, interval in self.SCHEDULED_JOBS.items()]
+        heapq.heapify(jobs)
 
         while self.is_running:
-            try:
-                await asyncio.sleep(300)  # 5分钟
+            deadline, name = heapq.heappop(jobs)
+            await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+            if not self.is_running:
+                break
+            await getattr(self, f'_{name}_job')()
+            heapq.heappush(jobs, (time.monotonic() + self.SCHEDULED_JOBS[name], name))
 
-                # 触发低优先级事件
-                try:
-                    await self.trigger_event(
-                        event_type='my_network',
-                        source='fallback_polling',
-                        priority='low',
-                        badge_count=1  # fallback 流程不基于红点数量
-                    )
-
-                    await self.trigger_event(
-                        event_type='messaging',
-                        source='fallback_polling',
-                        priority='low'
-                    )
-                except Exception as e:
-                    # Fallback 流程中的错误不应该导致循环停止
-                    # 只记录日志，继续运行
-                    logging.warning(
-                        f"Account {self.account_id}: Error in fallback polling event trigger: {e}. "
-                        f"Fallback loop will continue."
-                    )
+    def _stop(self):
+        """停止所有循环，并唤醒正在等待 observer 推送的 dom_monitor_loop"""
+        self.is_running = False
+        self._badge_queue.put_nowait(None)
+
+    async def _handle_browser_closed(self, e: Exception, where: str) -> bool:
+        """如果是浏览器关闭导致的异常，标记账号错误并停止监听"""
+        if "Target closed" in str(e) or "Browser closed" in str(e) or "Connection closed" in str(e):
+            self.log.error("Browser closed unexpectedly in %s: %s", where, e)
+            await self._mark_account_error(f"Browser closed in {where}: {str(e)}")
+            self._stop()
+            return True
+        return False
 
-            except Exception as e:
-                # 检查是否是浏览器关闭导致的异常
-                if "Target closed" in str(e) or "Browser closed" in str(e) or "Connection closed" in str(e):
-                    logging.error(f"Account {self.account_id}: Browser closed unexpectedly in fallback polling: {e}")
-                    await self._mark_account_error(f"Browser closed in fallback polling: {str(e)}")
-                    self.is_running = False
-                    break
-                logging.error(f"Fallback polling error: {e}", exc_info=True)
+    async def _fallback_job(self):
+        """Fallback 轮询，抓取可能耗时较长，放到单独的任务里执行，不阻塞心跳和状态检查"""
+        if self._fallback_task and not self._fallback_task.done():
+            self.log.info("previous fallback polling still running, skip")
+            return
+        self._fallback_task = asyncio.create_task(self._run_fallback_polling())
 
-    async def heartbeat_loop(self):
-        """心跳循环 - 每30秒更新一次"""
-        while self.is_running:
-            try:
-                await asyncio.sleep(30)
+    async def _run_fallback_polling(self):
+        try:
+            # 触发低优先级事件，两个事件一次提交，共用一次节流检查
+            await self.trigger_events([
+                ('my_network', 'fallback_polling', 'low', 1),  # fallback 流程不基于红点数量
+                ('messaging', 'fallback_polling', 'low', 0),
+            ])
+        except Exception as e:
+            # 浏览器关闭时停止监听；其他错误不应该导致定时任务停止，只记录日志，下次继续
+            if not await self._handle_browser_closed(e, 'fallback polling'):
+                self.log.warning("Error in fallback polling event trigger: %s. Fallback loop will continue.", e)
 
-                # 确保数据库连接可用
-                if not await db_health_checker.ensure_connection_async():
-                    logging.error(f"Account {self.account_id}: Database connection lost in heartbeat")
-                    continue
+    async def _heartbeat_job(self):
+        """心跳 - 每30秒写一次 Redis，每 HEARTBEAT_DB_EVERY 次同步一次数据库；Redis 写失败时本次直接写数据库"""
+        redis_ok = True
+        try:
+            await async_redis_client.set(HEARTBEAT_KEY.format(self._account_pk), time.time(), ex=HEARTBEAT_TTL)
+        except Exception as e:
+            # Redis 不可用时主进程按数据库 last_heartbeat_at 兜底，这里必须保证数据库心跳是新的
+            redis_ok = False
+            self.log.warning("Heartbeat redis write failed, falling back to database: %s", e)
 
-                # 更新数据库中的心跳时间
-                account = await MonitorAccount.objects.aget(id=int(self.account_id))
-                account.last_heartbeat_at = timezone.now()
-                # 使用 sync_to_async 包装同步的 save() 方法
-                await sync_to_async(account.save)()
+        try:
+            self._heartbeat_count += 1
+            if redis_ok and self._heartbeat_count % self.HEARTBEAT_DB_EVERY != 1:
+                return
 
-            except Exception as e:
-                # 检查是否是浏览器关闭导致的异常
-                if "Target closed" in str(e) or "Browser closed" in str(e) or "Connection closed" in str(e):
-                    logging.error(f"Account {self.account_id}: Browser closed unexpectedly in heartbeat: {e}")
-                    await self._mark_account_error(f"Browser closed in heartbeat: {str(e)}")
-                    self.is_running = False
-                    break
-                logging.error(f"Heartbeat error: {e}", exc_info=True)
+            # 确保数据库连接可用
+            if not await db_health_checker.ensure_connection_async():
+                self.log.error("Database connection lost in heartbeat")
+                return
 
-    async def monitor_enabled_check_loop(self):
-        """监控 enable 状态检查循环 - 每10秒检查一次"""
-        logging.info(f"Monitor enabled check loop started for {self.account_id}")
+            # 更新数据库中的心跳时间，直接 UPDATE，不需要先查询
+            await MonitorAccount.objects.filter(id=self._account_pk).aupdate(last_heartbeat_at=timezone.now())
 
-        while self.is_running:
-            try:
-                await asyncio.sleep(10)
-
-                # 确保数据库连接可用
-                if not await db_health_checker.ensure_connection_async():
-                    logging.warning(f"Account {self.account_id}: Database connection lost in monitor check")
-                    continue
-
-                # 检查 monitor_enabled 状态
-                account = await MonitorAccount.objects.aget(id=int(self.account_id))
-                if not account.monitor_enabled:
-                    logging.info(f"Account {self.account_id} monitor_enabled is False, stopping monitor...")
-                    # 停止所有循环
-                    self.is_running = False
-                    # 退出循环，触发 cleanup（主进程会上传 profile）
-                    break
+        except Exception as e:
+            if not await self._handle_browser_closed(e, 'heartbeat'):
+                self.log.error("Heartbeat error: %s", e, exc_info=True)
 
-            except MonitorAccount.DoesNotExist:
-                logging.error(f"Account {self.account_id} not found, stopping monitor...")
-                self.is_running = False
-                break
-            except Exception as e:
-                logging.error(f"Monitor enabled check error: {e}")
+    async def _enabled_check_job(self):
+        """监控 enable 状态检查 - 每10秒检查一次"""
+        try:
+            # 确保数据库连接可用
+            if not await db_health_checker.ensure_connection_async():
+                self.log.warning("Database connection lost in monitor check")
+                return
+
+            # 检查 monitor_enabled 状态，只查这一个字段
+            monitor_enabled = await MonitorAccount.objects.filter(
+                id=self._account_pk
+            ).values_list('monitor_enabled', flat=True).afirst()
+            if monitor_enabled is None:
+                raise MonitorAccount.DoesNotExist
+            if not monitor_enabled:
+                self.log.info("monitor_enabled is False, stopping monitor...")
+                # 停止所有循环，触发 cleanup（主进程会上传 profile）
+                self._stop()
+
+        except MonitorAccount.DoesNotExist:
+            self.log.error("not found, stopping monitor...")
+            self._stop()
+        except Exception as e:
+            self.log.error("Monitor enabled check error: %s", e)
 
     async def _mark_account_error(self, error_message: str):
         """标记账号为错误状态，并禁用监听"""
         try:
             # 确保数据库连接可用
             if not await db_health_checker.ensure_connection_async():
-                logging.error(f"Account {self.account_id}: Cannot mark as error - database connection lost")
+                self.log.error("Cannot mark as error - database connection lost")
                 return
             
-            account = await MonitorAccount.objects.aget(id=int(self.account_id))
-            account.status = 'error'
-            account.monitor_enabled = False
-            # 使用 sync_to_async 包装同步的 save() 方法
-            await sync_to_async(account.save)()
+            # 直接 UPDATE，不需要先查询；update 不会触发 auto_now，手动更新 updated_at
+            await MonitorAccount.objects.filter(id=self._account_pk).aupdate(
+                status='error',
+                monitor_enabled=False,
+                updated_at=timezone.now(),
+            )
 
             # 记录详细的错误日志
-            logging.error(
-                f"Account {self.account_id} ({account.email}) marked as ERROR. "
-                f"Reason: {error_message}. "
-                f"Monitor disabled. Status set to 'error'."
+            self.log.error(
+                "(%s) marked as ERROR. Reason: %s. Monitor disabled. Status set to 'error'.",
+                self._account_email, error_message
             )
         except Exception as e:
-            logging.error(
-                f"Failed to mark account {self.account_id} as error: {e}",
-                exc_info=True
-            )
+            self.log.error("Failed to mark account as error: %s", e, exc_info=True)
 
-    async def check_red_badge(self, link_type: str) -> tuple[bool, int]:
-        """检查红点是否存在，并返回红点上的数量
+    async def _on_badge_change(self, source, results):
+        """页面内 observer 的回调，只负责入队，由 dom_monitor_loop 串行处理；抓取离开 Feed 页面期间的推送直接丢弃"""
+        if self.event_handler.crawler.off_feed:
+            return
+        self._badge_queue.put_nowait(results)
 
-        Args:
-            link_type: 'my_network' 或 'messaging'
+    async def check_red_badges(self) -> dict[str, tuple[bool, int]]:
+        """一次性检查所有红点是否存在，并返回红点上的数量
 
         Returns:
-            tuple[bool, int]: (是否存在红点, 红点上的数量，如果不存在则返回0)
+            dict[str, tuple[bool, int]]: {link_type: (是否存在红点, 红点上的数量，如果不存在则返回0)}
         """
         try:
-            # 使用原始 XPath 方法
-            xpath = self.XPATHS.get(link_type)
-            if not xpath:
-                logging.error(f"No XPath found for link_type: {link_type}")
-                return False, 0
-
-            if link_type == 'messaging':
-                try:
-                    # 等待元素出现，如果超时或找不到则返回 False
-                    await self.page.wait_for_selector(f'xpath={xpath}', timeout=10000)
-                    
-                    locator = self.page.locator(f'xpath={xpath}')
-                    
-                    # 使用 await 获取文本（inner_text 是异步方法）
-                    text = await locator.inner_text()
-                    
-                    # 提取数字
-                    match = re.search(r'\d+', text) if text else None
-                    count = int(match.group()) if match else 0
-                    
-                    # 根据 count 判断是否找到红点
-                    result = {
-                        'found': count > 0,
-                        'count': count,
-                        'method': 'messaging_xpath'
-                    }
-                except Exception as e:
-                    # 如果等待超时或元素不存在，返回未找到
-                    logging.debug(f"Messaging badge check failed: {e}")
-                    result = {
-                        'found': False,
-                        'count': 0,
-                        'reason': f'wait_selector_failed: {str(e)}'
-                    }
-            else:
-                # 使用 JavaScript 通过 XPath 查找红点元素
-                find_badge_script = """
-                (xpath) => {
-                    // 辅助函数：检查元素是否可见（宽松检查）
-                    function isElementVisible(element) {
-                        if (!element) return false;
-                        
-                        const style = window.getComputedStyle(element);
-                        const rect = element.getBoundingClientRect();
-                        
-                        // 只检查最基本的隐藏方式
-                        if (style.display === 'none') return false;
-                        if (style.visibility === 'hidden') return false;
-                        
-                        // 检查尺寸（宽松一点，只要有一点尺寸就认为可见）
-                        if (rect.width < 1 && rect.height < 1) return false;
-                        
-                        return true;
-                    }
-                    
-                    // 辅助函数：提取数字（宽松版本）
-                    function extractNumber(text) {
-                        if (!text) return null;
-                        
-                        const cleaned = text.trim();
-                        if (!cleaned) return null;
-                        
-                        // 尝试多种匹配方式
-                        // 1. 纯数字: "3", " 5 "
-                        let pureMatch = cleaned.match(/^\\s*(\\d+)\\s*$/);
-                        if (pureMatch) {
-                            return parseInt(pureMatch[1]);
-                        }
-                        
-                        // 2. 数字在开头: "5 new", "3+"
-                        let startMatch = cleaned.match(/^(\\d+)/);
-                        if (startMatch) {
-                            return parseInt(startMatch[1]);
-                        }
-                        
-                        // 3. 提取任何数字
-                        let anyMatch = cleaned.match(/\\d+/);
-                        if (anyMatch) {
-                            return parseInt(anyMatch[0]);
-                        }
-                        
-                        return null;
-                    }
-                    
-                    try {
-                        // 方法1: 使用 XPath 查找（主要方法）
-                        const xpathResult = document.evaluate(
-                            xpath,
-                            document,
-                            null,
-                            XPathResult.FIRST_ORDERED_NODE_TYPE,
-                            null
-                        );
-                        
-                        const xpathElement = xpathResult.singleNodeValue;
-                        
-                        if (xpathElement && isElementVisible(xpathElement)) {
-                            const text = xpathElement.textContent || xpathElement.innerText || '';
-                            const number = extractNumber(text);
-                            
-                            if (number !== null && number > 0) {
-                                const style = window.getComputedStyle(xpathElement);
-                                const rect = xpathElement.getBoundingClientRect();
-                                
-                                return {
-                                    found: true,
-                                    count: number,
-                                    method: 'xpath',
-                                    debug: {
-                                        tagName: xpathElement.tagName,
-                                        className: xpathElement.className,
-                                        textContent: text.trim().substring(0, 100),
-                                        display: style.display,
-                                        visibility: style.visibility,
-                                        opacity: style.opacity,
-                                        width: rect.width,
-                                        height: rect.height
-                                    }
-                                };
-                            } else {
-                                // XPath 找到了元素，但没有有效数字
-                                return {
-                                    found: false,
-                                    count: 0,
-                                    reason: 'xpath_found_but_no_number',
-                                    debug: {
-                                        textContent: text.substring(0, 100),
-                                        extractedNumber: number
-                                    }
-                                };
-                            }
-                        }
-                        
-                        // 方法2: XPath 失败，尝试备用方案（查找包含特定 href 的链接下的数字）
-                        const hrefPattern = xpath.includes('mynetwork') ? 'mynetwork' : 'messaging';
-                        const links = Array.from(document.querySelectorAll('a')).filter(a => {
-                            const href = a.getAttribute('href') || '';
-                            return href.includes(hrefPattern);
-                        });
-                        
-                        for (const link of links) {
-                            // 在链接中查找包含数字的可见子元素
-                            const allSpans = link.querySelectorAll('span');
-                            
-                            for (const span of allSpans) {
-                                if (!isElementVisible(span)) continue;
-                                
-                                const text = span.textContent || span.innerText || '';
-                                const number = extractNumber(text);
-                                
-                                if (number !== null && number > 0) {
-                                    // 额外验证：这个 span 应该比较小（红点通常很小）
-                                    const rect = span.getBoundingClientRect();
-                                    // 如果宽度或高度在 10-100px 之间，更可能是红点
-                                    const style = window.getComputedStyle(span);
-                                    
-                                    return {
-                                        found: true,
-                                        count: number,
-                                        method: 'fallback_span',
-                                        debug: {
-                                            tagName: span.tagName,
-                                            className: span.className,
-                                            textContent: text.trim().substring(0, 100),
-                                            width: rect.width,
-                                            height: rect.height,
-                                            backgroundColor: style.backgroundColor
-                                        }
-                                    };
-                                }
-                            }
-                        }
-                        
-                        // 都没找到
-                        return {
-                            found: false,
-                            count: 0,
-                            reason: 'all_methods_failed',
-                            debug: {
-                                xpath: xpath,
-                                xpathElementFound: xpathElement !== null,
-                                linksFound: links.length
-                            }
-                        };
-                        
-                    } catch (error) {
-                        return { 
-                            found: false, 
-                            count: 0, 
-                            reason: 'exception',
-                            error: error.message 
-                        };
-                    }
-                }
-                """
-
-                # 执行 JavaScript
-                result = await self.page.evaluate(find_badge_script, xpath)
-
+            args = {'xpaths': self.XPATHS, 'debug': logging.getLogger().isEnabledFor(logging.DEBUG)}
+            results = await self.page.evaluate(CALL_FIND_BADGES_SCRIPT, args)
+            if results is None:
+                # 初始化脚本还没注入（例如页面仍在加载），手动注入一次后再调用
+                await self.page.evaluate(BADGE_HELPERS_SCRIPT)
+                results = await self.page.evaluate(CALL_FIND_BADGES_SCRIPT, args)
+        except Exception as e:
+            self.log.error("check_red_badges error: %s", e, exc_info=True)
+            return {key: (False, 0) for key in self.XPATHS}
+        return self._parse_badge_results(results)
+
+    def _parse_badge_results(self, results: dict) -> dict[str, tuple[bool, int]]:
+        """把页面返回的 {key: {found, count, ...}} 转换成 {key: (是否存在红点, 数量)}"""
+        badges = {}
+        for link_type in self.XPATHS:
+            result = results.get(link_type) or {}
             if result.get('found'):
-                # 改为 info 级别，方便查看
-                logging.info(
-                    f"✓ Badge found for {link_type}: count={result['count']}, "
-                    f"method={result.get('method')}, debug={result.get('debug', {})}"
+                self.log.debug(
+                    "✓ Badge found for %s: count=%s, method=%s, debug=%s",
+                    link_type, result['count'], result.get('method'), result.get('debug') or {}
                 )
-                return True, result['count']
+                badges[link_type] = (True, result['count'])
             else:
-                # 改为 info 级别，方便调试
-                logging.info(
-                    f"✗ No badge for {link_type}: reason={result.get('reason')}, "
-                    f"debug={result.get('debug', {})}"
+                self.log.debug(
+                    "✗ No badge for %s: reason=%s, debug=%s",
+                    link_type, result.get('reason'), result.get('debug') or {}
                 )
-                return False, 0
-
-        except Exception as e:
-            logging.error(f"check_red_badge error for {link_type}: {e}", exc_info=True)
-            return False, 0
+                badges[link_type] = (False, 0)
+        return badges
 
     async def trigger_event(self, event_type: str, source: str, priority: str, badge_count: int = 0):
         """触发事件处理
@@ -533,7 +515,7 @@ class AccountMonitor:
             priority: 优先级
             badge_count: 红点上的数量（仅对 DOM 监听有效）
         """
-        logging.info(f"Event triggered: {event_type}, source={source}, priority={priority}, badge_count={badge_count}")
+        self.log.info("Event triggered: %s, source=%s, priority=%s, badge_count=%s", event_type, source, priority, badge_count)
 
         # 交给事件处理器处理
         await self.event_handler.handle_event(
@@ -544,12 +526,23 @@ class AccountMonitor:
             badge_count=badge_count
         )
 
+    async def trigger_events(self, events: list[tuple[str, str, str, int]]):
+        """批量触发事件处理
+
+        Args:
+            events: [(event_type, source, priority, badge_count), ...]
+        """
+        self.log.info("Events triggered: %s", events)
+        await self.event_handler.handle_events(page=self.page, events=events)
+
     async def cleanup(self):
         """清理资源"""
-        logging.info(f"Cleaning up AccountMonitor for {self.account_id}")
+        self.log.info("Cleaning up AccountMonitor")
+
+        if self._fallback_task and not self._fallback_task.done():
+            self._fallback_task.cancel()
 
         if self.browser:
             await self.browser.close()
 
-        if self.playwright:
-            await self.playwright.stop()
\ No newline at end of file
+        # Playwright driver 是进程级共享的，这里只关闭浏览器，driver 由 stop_playwright 在进程退出前关闭
\ No newline at end of file
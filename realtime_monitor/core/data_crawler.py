@@ -1,21 +1,25 @@
 import asyncio
 import logging
 import os
+import random
 import sys
 import time
 # import aiohttp
 from datetime import datetime, timezone
 from typing import List, Dict, Optional
 
-import requests
+import httpx
+import orjson
 from asgiref.sync import sync_to_async
 
 import django
+from django.db import connection, DataError, IntegrityError
 from django.utils import timezone as django_timezone
+from psycopg2.extras import execute_values
 
-from realtime_monitor.utils.utils import _handle_conversations
-from common.wechat_bot import send_wechat_message
-from linkedin_realtime_monitor.settings import WechatRobotKey
+from realtime_monitor.utils.utils import _handle_conversations, _timestamp_to_datetime_utc
+from common.wechat_bot import send_wechat_message_async
+from linkedin_realtime_monitor.settings import WechatRobotKey, RAW_SQL_BULK_WRITE
 
 # 项目根目录路径（根据你的实际结构调整）
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -24,22 +28,168 @@ sys.path.append(BASE_DIR)
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "linkedin_realtime_monitor.settings")  # 替换成你的 settings 路径
 django.setup()
 
-from lkp_client_base_utils.lkp_client_base import LKPClientBase
+from lkp_client_base_utils.lkp_client_base import AsyncLKPClientBase
 from realtime_monitor.models import RealtimeConnection, RealtimeConversation, MonitorAccount
 from realtime_monitor.core.db_health_check import db_health_checker
 
+# 好友列表第一页之后，每轮并发预取的页数
+CONNECTION_PREFETCH_PAGES = 3
+
+# 同一进程内同时发往 LKP 代理的 LinkedIn 请求上限，避免并发翻页触发 LinkedIn 限流
+LKP_REQUEST_SEMAPHORE = asyncio.Semaphore(16)
+
+# 清除红点后判断红点是否已消失
+CLEARED_BADGE_SCRIPT = """
+(xpaths) => {
+    if (!window.__bm) return true;
+    const results = window.__bm.findBadges(xpaths, false);
+    return Object.values(results).every(badge => !badge || !badge.found);
+}
+"""
+
+# 批量写库时每条 SQL 最多包含的行数，避免单条 INSERT 过大
+BULK_CREATE_BATCH_SIZE = int(os.environ.get("REALTIME_BULK_BATCH_SIZE", "500"))
+
+# 已存在的好友重新抓取到时需要刷新的资料字段
+CONNECTION_REFRESH_FIELDS = ('first_name', 'last_name', 'headline', 'public_id')
+
+# 已存在的对话需要更新的字段
+CONVERSATION_UPDATE_FIELDS = (
+    'conversation_id',
+    'public_id',
+    'member_id',
+    'conversation_url',
+    'first_name',
+    'last_name',
+    'distance',
+    'unread_count',
+    'dialogue_created_at',
+    'last_activity_at',
+    'last_read_at',
+    'is_group_chat',
+    'last_message_text',
+    'last_message_sender',
+    'last_message_delivered_at',
+    'source',
+)
+
+# 对话中有长度限制的字段，写库前校验，避免一条超长数据导致整条批量语句失败
+CONVERSATION_MAX_LENGTHS = {
+    field.name: field.max_length
+    for field in RealtimeConversation._meta.concrete_fields
+    if field.name in ('hash_id', *CONVERSATION_UPDATE_FIELDS) and field.max_length
+}
+
+_lkp_client: Optional[AsyncLKPClientBase] = None
+
+
+def get_lkp_client() -> AsyncLKPClientBase:
+    """进程内复用的 prod LKP 客户端，懒加载，底层 httpx 连接被关闭后重新创建"""
+    global _lkp_client
+    if _lkp_client is None or _lkp_client.client.is_closed:
+        _lkp_client = AsyncLKPClientBase('prod')
+    return _lkp_client
+
+_callback_client: Optional[httpx.AsyncClient] = None
+
+
+def get_callback_client() -> httpx.AsyncClient:
+    """进程内复用的 Business 回调 HTTP 客户端，保持长连接，懒加载以绑定子进程的事件循环"""
+    global _callback_client
+    if _callback_client is None or _callback_client.is_closed:
+        _callback_client = httpx.AsyncClient(
+            # 回调按事件批次触发，间隔较长，空闲连接多保留一会儿以便下一批复用 TLS 连接
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+            timeout=10,
+        )
+    return _callback_client
+
+
+async def close_callback_client():
+    """关闭回调 HTTP 客户端，在监听子进程退出前调用"""
+    global _callback_client
+    if _callback_client is not None:
+        await _callback_client.aclose()
+        _callback_client = None
+
+
+def _conversation_row_problem(conv_data: dict) -> Optional[str]:
+    """检查一条对话能否写入数据库，不能写入时返回原因，可以写入时返回 None"""
+    if not conv_data['hash_id']:
+        # 没有参与者信息的对话拿不到 hash_id，而 hash_id 不允许为空
+        return 'missing participant hash_id'
+    for field, max_length in CONVERSATION_MAX_LENGTHS.items():
+        value = conv_data.get(field)
+        if isinstance(value, str) and len(value) > max_length:
+            return f'{field} longer than {max_length}'
+    return None
+
+
+def _upsert_conversations_sql(account_pk: int, conversations: List[dict]):
+    """用一条多行 INSERT ... ON CONFLICT (account_id, hash_id) DO UPDATE 写入对话
+
+    字段已经在解析阶段处理好（并经过 _conversation_row_problem 校验），直接绕过 ORM 的模型实例化，仅支持 PostgreSQL；
+    数据库错误转换成 Django 的异常类型，调用方按 IntegrityError/DataError 退回逐条写入
+    """
+    meta = RealtimeConversation._meta
+    columns = [meta.get_field(field).column for field in CONVERSATION_UPDATE_FIELDS]
+    column_sql = ', '.join(f'"{column}"' for column in columns)
+    update_sql = ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in columns)
+    sql = (
+        f'INSERT INTO "{meta.db_table}" ("account_id", "hash_id", {column_sql}) VALUES %s '
+        f'ON CONFLICT ("account_id", "hash_id") DO UPDATE SET {update_sql}'
+    )
+    rows = [
+        (account_pk, conv_data['hash_id'], *(conv_data[field] for field in CONVERSATION_UPDATE_FIELDS))
+        for conv_data in conversations
+    ]
+    with connection.cursor() as cursor, connection.wrap_database_errors:
+        execute_values(cursor.cursor, sql, rows, page_size=BULK_CREATE_BATCH_SIZE)
+
+
+def _insert_connections_sql(account_pk: int, rows: List[dict]):
+    """用多行 INSERT ... ON CONFLICT DO NOTHING 写入新好友，等价于 bulk_create(ignore_conflicts=True)，仅支持 PostgreSQL"""
+    meta = RealtimeConnection._meta
+    fields = list(rows[0])
+    column_sql = ', '.join(f'"{meta.get_field(field).column}"' for field in fields)
+    sql = f'INSERT INTO "{meta.db_table}" ("account_id", {column_sql}) VALUES %s ON CONFLICT DO NOTHING'
+    values = [(account_pk, *(row[field] for field in fields)) for row in rows]
+    with connection.cursor() as cursor:
+        execute_values(cursor.cursor, sql, values, page_size=BULK_CREATE_BATCH_SIZE)
+
 
 class DataCrawler:
     """数据抓取器"""
 
     def __init__(self, account_id: str):
         self.account_id = account_id
-
-    async def crawl_connections(self, page, max_pages: Optional[int] = None) -> int:
+        self._account_pk = int(account_id)
+        # 本轮抓取使用的 MonitorAccount，由 crawl_* 入口刷新，内部的保存/通知方法直接复用
+        self._account: Optional[MonitorAccount] = None
+        # 清除红点时离开了 Feed 页面，等待 return_to_feed 导航回去
+        self._off_feed = False
+        # 好友和消息抓取可能并发，共用同一个 page，导航需要串行
+        self._page_lock = asyncio.Lock()
+        # 抓取过程中需要清除的红点，抓取本身不操作页面，由 clear_pending_notifications 在抓取结束后统一串行导航清除
+        self._pending_clears: List[str] = []
+
+    @property
+    def off_feed(self) -> bool:
+        """当前页面是否因清除红点离开了 Feed 页面，此时页面上的红点状态不可信"""
+        return self._off_feed
+
+    async def _get_account(self, refresh: bool = False) -> MonitorAccount:
+        """获取当前账号对象，refresh=True 时重新从数据库读取"""
+        if refresh or self._account is None:
+            self._account = await MonitorAccount.objects.aget(id=self._account_pk)
+        return self._account
+
+    async def crawl_connections(self, max_pages: Optional[int] = None) -> int:
         """抓取好友列表（使用 get_connections_v2 接口）
 
+        只请求接口和写库，不操作页面；需要清除的红点记录下来，由 clear_pending_notifications 统一处理
+
         Args:
-            page: Playwright page 对象
             max_pages: 最大翻页次数，None 表示不限制（保持原有逻辑）
 
         Returns:
@@ -48,16 +198,16 @@ class DataCrawler:
         logging.info(f"Crawling connections for {self.account_id}, max_pages={max_pages}")
 
         # 确保数据库连接可用
-        if not await db_health_checker.ensure_connection_async():
+        if not await db_health_checker.ensure_connection_cached_async():
             logging.error(f"Database connection not available for crawl_connections")
             return 0
 
         # 获取账号信息
-        account = await MonitorAccount.objects.aget(id=int(self.account_id))
+        account = await self._get_account(refresh=True)
         sender_email = account.email
 
-        # 初始化 LKPClient
-        lkpc = LKPClientBase('prod')
+        # LKPClient（异步版本，请求期间不阻塞事件循环）
+        lkpc = get_lkp_client()
 
         # 获取数据库中最新的好友 hash_id（用于去重）
         latest_hash_id = await self._get_latest_connection_profile_id()
@@ -68,26 +218,39 @@ class DataCrawler:
         should_stop = False
         current_page = 0
 
-        # 循环获取所有新好友
+        # 循环获取所有新好友：第一页单独请求（多数情况下一页就能遇到已存在的好友），之后每轮并发预取多页
         while not should_stop:
-            try:
+            window = 1 if current_page == 0 else CONNECTION_PREFETCH_PAGES
+            if max_pages is not None:
+                window = min(window, max_pages - current_page)
+            if window <= 0:
+                break
 
-                # 调用 LinkedIn get_connections_v2 API
-                lk_connections_data = lkpc.make_a_linked_in_request(
-                    sender_email,
-                    category='extended',
-                    method_name='get_connections_v2',
-                    params={"start": start, 'count': count}
-                )
+            pages = await asyncio.gather(
+                *[self._fetch_connections_page(lkpc, sender_email, start + i * count, count) for i in range(window)],
+                return_exceptions=True
+            )
+
+            # 按页顺序处理，保证遇到已存在好友时丢弃之后的预取结果
+            for page_offset, lk_connections_data in enumerate(pages):
+                page_start = start + page_offset * count
+                if isinstance(lk_connections_data, asyncio.CancelledError):
+                    raise lk_connections_data
+                if isinstance(lk_connections_data, BaseException):
+                    logging.error(f"获取连接数据失败: {lk_connections_data}", exc_info=lk_connections_data)
+                    should_stop = True
+                    break
 
                 if not lk_connections_data:
-                    logging.warning(f"API 返回空数据: start={start}, count={count}")
+                    logging.warning(f"API 返回空数据: start={page_start}, count={count}")
+                    should_stop = True
                     break
 
                 connections_data = lk_connections_data.get('elements', [])
 
                 if not connections_data:
                     logging.info(f"没有更多连接数据，停止请求")
+                    should_stop = True
                     break
 
                 # 检查去重：如果遇到已存在的好友，停止
@@ -95,7 +258,7 @@ class DataCrawler:
                     profile_dict = conn_info.get('connectedMemberResolutionResult', {})
                     if profile_dict:
                         entity_urn = profile_dict.get('entityUrn', '')
-                        hash_id = entity_urn.split(':')[-1] if entity_urn else None
+                        hash_id = entity_urn.rpartition(':')[2] if entity_urn else None
 
                         # 遇到已存在的好友，停止
                         if hash_id == latest_hash_id:
@@ -110,20 +273,17 @@ class DataCrawler:
                 # 如果返回的数据少于请求的数量，说明没有更多数据了
                 if len(connections_data) < count:
                     logging.info(f"返回数据少于请求数量 ({len(connections_data)} < {count})，停止请求")
+                    should_stop = True
                     break
 
                 # 检查是否达到最大翻页次数限制
                 current_page += 1
                 if max_pages is not None and current_page >= max_pages:
                     logging.info(f"达到最大翻页次数限制 ({current_page} >= {max_pages})，停止请求")
+                    should_stop = True
                     break
 
-                start += count
-                await asyncio.sleep(2)  # 分页间隔
-
-            except Exception as e:
-                logging.error(f"获取连接数据失败: {e}", exc_info=True)
-                break
+            start += window * count
 
         if raw_connections_data:
             # 批量查询 member_id（优化性能）
@@ -145,21 +305,25 @@ class DataCrawler:
                 saved_connections = await self._save_connections_v2(parsed_connections)
                 logging.info(f"Saved {len(saved_connections)} new connections")
 
-                # 通知 Business 方
-                notification_success = await self._notify_business_conversations(saved_connections, 'my_network')
+                if saved_connections:
+                    # 通知 Business 方
+                    notification_success = await self._notify_business_conversations(saved_connections, 'my_network')
 
-                # 如果通知成功，清除 My Network 红点
-                if notification_success:
-                    await self._clear_notification(page, notification_source='my_network')
+                    # 如果通知成功，清除 My Network 红点
+                    if notification_success:
+                        self._schedule_clear_notification('my_network')
+                else:
+                    # 全部已在库中，不需要重复通知
+                    self._schedule_clear_notification('my_network')
             else:
                 logging.info(f"No new connections found after parsing")
         else:
             logging.info(f"No new connections data retrieved from API")
-            await self._clear_notification(page, notification_source='my_network')
+            self._schedule_clear_notification('my_network')
             parsed_connections = []
         return len(parsed_connections)
 
-    async def crawl_conversations(self, page) -> int:
+    async def crawl_conversations(self) -> int:
         """抓取对话列表
 
         优化策略：
@@ -170,6 +334,7 @@ class DataCrawler:
 
         使用 conversations_by_sync_token（第一页）和 conversations_by_category（翻页）接口
         LinkedIn 按 last_message_delivered_at 从大到小（降序）返回对话
+        只请求接口和写库，不操作页面；需要清除的红点记录下来，由 clear_pending_notifications 统一处理
 
         Returns:
             int: 更新的对话数量
@@ -177,29 +342,32 @@ class DataCrawler:
         logging.info(f"Crawling conversations for {self.account_id}")
 
         # 确保数据库连接可用
-        if not await db_health_checker.ensure_connection_async():
+        if not await db_health_checker.ensure_connection_cached_async():
             logging.error(f"Database connection not available for crawl_conversations")
             return 0
 
         # 获取账号信息，用于调用 LKP 接口
-        account = await MonitorAccount.objects.aget(id=int(self.account_id))
+        account = await self._get_account(refresh=True)
         sender_email = account.email
         hash_id = account.hash_id
 
-        lkpc = LKPClientBase('prod')
+        lkpc = get_lkp_client()
 
         # ⚡ 关键优化：先获取DB中当前账号的最大消息时间
         db_max_time = await self._get_max_message_time()
         logging.info(f"DB max message time: {db_max_time}")
+        # 统一为带 UTC 时区的时间，翻页判断和保存过滤都直接与 API 时间比较
+        if db_max_time and db_max_time.tzinfo is None:
+            db_max_time = db_max_time.replace(tzinfo=timezone.utc)
 
         if not hash_id:
             try:
-                connection_response = lkpc.make_a_linked_in_request(sender_email, 'extended', 'connection_summary', {})
+                connection_response = await self._lkp_request(lkpc, sender_email, 'connection_summary', {})
                 entity_urn = connection_response.get('entityUrn', "") if connection_response else ""
-                hash_id = entity_urn.split(":")[-1] if entity_urn else ""
+                hash_id = entity_urn.rpartition(":")[2]
                 if hash_id:
                     account.hash_id = hash_id
-                    await sync_to_async(account.save)()
+                    await MonitorAccount.objects.filter(id=account.id).aupdate(hash_id=hash_id)
             except Exception as e:
                 logging.error(f"Failed to fetch hash_id for account {self.account_id}: {e}", exc_info=True)
                 # 如果获取 hash_id 失败，继续尝试使用空的 hash_id（可能会在后续失败）
@@ -208,66 +376,102 @@ class DataCrawler:
             logging.warning(f"Account {self.account_id} has no hash_id, skipping conversation crawl")
             return 0
 
-        all_messages = []
+        # 翻页请求和写库流水线执行：第 N 页写库时第 N+1 页的请求已经发出
+        # 队列容量 2，写库跟不上时翻页自动等待；None 表示翻页结束
+        page_queue: asyncio.Queue = asyncio.Queue(maxsize=2)
+        # 跨页重复的对话以后写入的为准，通知时每个 hash_id 只保留一条
+        updated_by_hash_id: Dict[str, dict] = {}
+        total_messages = 0
+
+        # 任一方抛异常时 TaskGroup 会取消另一方，不会卡在队列上
+        async def produce():
+            async for messages in self._iter_conversation_pages(lkpc, sender_email, hash_id, db_max_time):
+                await page_queue.put(messages)
+            await page_queue.put(None)
+
+        async def consume():
+            nonlocal total_messages
+            while (messages := await page_queue.get()) is not None:
+                total_messages += len(messages)
+                # 只新增或更新 last_activity_at > db_max_time 的对话
+                _, updated_convs = await self._save_conversations_from_all_messages(messages, db_max_time)
+                for conv_data in updated_convs:
+                    updated_by_hash_id[conv_data['hash_id']] = conv_data
+
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(produce())
+            tg.create_task(consume())
+
+        logging.info('all_messages: {}'.format(total_messages))
+        all_updated_conversations = list(updated_by_hash_id.values())
+        total_updated = len(all_updated_conversations)
+
+        # 通知 Business 方
+        if all_updated_conversations:
+            notification_success = await self._notify_business_conversations(all_updated_conversations, 'message')
+
+            # 如果通知成功，清除 message 红点
+            if notification_success:
+                self._schedule_clear_notification('message')
+        else:
+            logging.info(f"No new or updated conversations to notify")
+            self._schedule_clear_notification('message')
+
+        logging.info(f"Processed {total_updated} conversations for {self.account_id}")
+        return total_updated
+
+    async def _iter_conversation_pages(self, lkpc, sender_email: str, hash_id: str, db_max_time: Optional[datetime]):
+        """逐页请求对话列表，每页产出 _handle_conversations 格式化后的对话列表
+
+        第一页使用 conversations_by_sync_token，之后以上一页最后一条对话的 last_activity_at 为游标翻页，
+        游标不晚于 db_max_time 时停止
+        """
+        last_message = None
 
         # 循环请求多页数据, 每页20条， 最多10页
         for page_num in range(10):
             try:
                 if page_num == 0:
                     # 第一页：使用 conversations_by_sync_token
-                    response = lkpc.make_a_linked_in_request(
+                    response = await self._lkp_request(
+                        lkpc,
                         sender_email,
-                        category='extended',
-                        method_name='conversations_by_sync_token',
-                        params={'fsd_profile': hash_id}
+                        'conversations_by_sync_token',
+                        {'fsd_profile': hash_id}
                     )
                 else:
                     # 翻页：使用 conversations_by_category
-                    # 从上一页最后一条消息获取 last_activity_at
-                    if not all_messages:
+                    # 从上一页最后一条消息获取 last_activity_at（由本地记录，不依赖写库结果）
+                    if last_message is None:
                         break  # 如果上一页没有数据，停止翻页
 
-                    last_message = all_messages[-1]
                     last_activity_at_iso = last_message.get('last_activity_at')
 
                     if not last_activity_at_iso:
                         break  # 如果没有 last_activity_at，无法翻页
 
                     # 将 ISO 格式字符串转换回时间戳（毫秒级）用于 API 请求
-                    try:
-                        # 解析 ISO 格式字符串为 datetime 对象
-                        dt = datetime.fromisoformat(last_activity_at_iso.replace('Z', '+00:00'))
-                        # 确保有时区信息
-                        if dt.tzinfo is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-
-                        # 如果数据库中的最大时间不为空，且当前时间小于等于最大时间，停止翻页
-                        # 确保 db_max_time 也有时区信息进行比较
-                        if db_max_time:
-                            # 如果 db_max_time 没有时区信息，添加 UTC 时区
-                            if db_max_time.tzinfo is None:
-                                db_max_time_utc = db_max_time.replace(tzinfo=timezone.utc)
-                            else:
-                                db_max_time_utc = db_max_time
-                            
-                            if dt <= db_max_time_utc:
-                                logging.info(
-                                    f"🛑 Last conversation time ({dt}) ≤ DB max time ({db_max_time_utc}), "
-                                    f"stopping pagination at page {page_num}"
-                                )
-                                break
-
-                        # 转换为毫秒级时间戳
-                        last_activity_at_timestamp = int(dt.timestamp() * 1000)
-                    except (ValueError, AttributeError) as e:
-                        logging.warning(f"Failed to parse last_activity_at for pagination: {e}")
+                    dt = self._parse_iso(last_activity_at_iso)
+                    if dt is None:
+                        logging.warning(f"Failed to parse last_activity_at for pagination: {last_activity_at_iso!r}")
                         break  # 如果解析失败，停止翻页
 
-                    response = lkpc.make_a_linked_in_request(
+                    # 如果数据库中的最大时间不为空，且当前时间小于等于最大时间，停止翻页
+                    if db_max_time and dt <= db_max_time:
+                        logging.info(
+                            f"🛑 Last conversation time ({dt}) ≤ DB max time ({db_max_time}), "
+                            f"stopping pagination at page {page_num}"
+                        )
+                        break
+
+                    # 转换为毫秒级时间戳
+                    last_activity_at_timestamp = int(dt.timestamp() * 1000)
+
+                    response = await self._lkp_request(
+                        lkpc,
                         sender_email,
-                        category='extended',
-                        method_name='conversations_by_category',
-                        params={
+                        'conversations_by_category',
+                        {
                             'fsd_profile': hash_id,
                             'last_activity_at': last_activity_at_timestamp
                         }
@@ -306,33 +510,62 @@ class DataCrawler:
             if not elements:
                 break  # 如果当前页没有数据，停止翻页
 
-            # 使用 sync_to_async 包装同步函数调用，避免在异步上下文中直接调用同步数据库操作
-            current_messages = await sync_to_async(_handle_conversations)(elements, hash_id)
-            all_messages += current_messages
+            current_messages = _handle_conversations(elements, hash_id)
+            if current_messages:
+                last_message = current_messages[-1]
+                yield current_messages
 
-        logging.info('all_messages: {}'.format(len(all_messages)))
-        # 处理 all_messages，获取最新的对话消息，只新增或更新 last_activity_at > db_max_time 的对话
-        # 保存到数据库
-        updated_count, updated_convs = await self._save_conversations_from_all_messages(
-            all_messages,
-            db_max_time
-        )
-        total_updated = updated_count
-        all_updated_conversations = updated_convs
+    def _preprocess_conversation(self, msg: dict, db_max_time: Optional[datetime]) -> Optional[dict]:
+        """把 _handle_conversations 返回的一条对话转换为 RealtimeConversation 字段字典
 
-        # 通知 Business 方
-        if all_updated_conversations:
-            notification_success = await self._notify_business_conversations(all_updated_conversations, 'message')
+        Returns:
+            Optional[dict]: 对话数据；缺少/无法解析 last_activity_at 或不晚于 db_max_time 时返回 None
+        """
+        hash_id = msg.get('hash_id', '')
 
-            # 如果通知成功，清除 message 红点
-            if notification_success:
-                await self._clear_notification(page, notification_source='message')
-        else:
-            logging.info(f"No new or updated conversations to notify")
-            await self._clear_notification(page, notification_source='message')
+        # 解析时间字段（ISO 格式字符串 -> datetime）
+        last_activity_at_str = msg.get('last_activity_at')
+        if not last_activity_at_str:
+            logging.warning(f"Conversation {hash_id} missing last_activity_at, skipping")
+            return None
 
-        logging.info(f"Processed {total_updated} conversations for {self.account_id}")
-        return total_updated
+        # 将 ISO 格式字符串转换为 datetime 对象
+        last_activity_at = self._parse_iso(last_activity_at_str)
+        if last_activity_at is None:
+            logging.warning(f"Failed to parse last_activity_at for {hash_id}: {last_activity_at_str!r}")
+            return None
+
+        # 关键过滤：只处理时间 > db_max_time 的对话
+        if db_max_time and last_activity_at <= db_max_time:
+            logging.debug(
+                f"⏭️ Skipping old conversation: {hash_id} "
+                f"(API: {last_activity_at} ≤ DB: {db_max_time})"
+            )
+            return None  # 跳过旧对话
+
+        # 解析最后一条消息
+        last_message = msg.get('last_message') or {}
+
+        # 准备对话数据
+        return {
+            'hash_id': hash_id,
+            'conversation_id': msg.get('conversation_id', ''),
+            'public_id': msg.get('public_id', ''),
+            'member_id': msg.get('member_id', ''),
+            'conversation_url': msg.get('conversation_url', ''),
+            'first_name': msg.get('first_name', ''),
+            'last_name': msg.get('last_name', ''),
+            'distance': msg.get('distance', ''),
+            'unread_count': msg.get('unread_count', 0),
+            'dialogue_created_at': self._parse_iso(msg.get('created_at')),
+            'last_activity_at': last_activity_at,
+            'last_read_at': self._parse_iso(msg.get('last_read_at')),
+            'is_group_chat': msg.get('is_group_chat', False),
+            'last_message_text': last_message.get('text', ''),
+            'last_message_sender': last_message.get('sender', ''),
+            'last_message_delivered_at': self._parse_iso(last_message.get('delivered_at')),
+            'source': msg.get('source', 'original'),
+        }
 
     async def _save_conversations_from_all_messages(
             self,
@@ -350,151 +583,94 @@ class DataCrawler:
         Returns:
             tuple[int, List[dict]]: (更新的对话数量, 更新的对话数据列表)
         """
+        # 第一阶段：纯 Python 解析 + db_max_time 过滤，稳定状态下大部分对话在这里被过滤掉，不产生任何数据库操作
+        # 按 hash_id 收集待写入的对话；同一批中重复的 hash_id 以后出现的为准（与逐条更新的最终结果一致）
+        # 单条对话解析失败只跳过这一条，不影响同一页的其他对话
+        pending: Dict[str, dict] = {}
+        for msg in all_messages:
+            try:
+                conv_data = self._preprocess_conversation(msg, db_max_time)
+            except Exception as e:
+                logging.error(f"Error processing conversation {msg.get('hash_id')}: {e}", exc_info=True)
+                continue
+            if conv_data is None:
+                continue
+            problem = _conversation_row_problem(conv_data)
+            if problem:
+                logging.warning(f"Conversation {conv_data['conversation_url']} skipped: {problem}")
+                continue
+            pending[conv_data['hash_id']] = conv_data
+
+        if not pending:
+            return 0, []
+
+        # 第二阶段：批量写库
         # 确保数据库连接可用
-        if not await db_health_checker.ensure_connection_async():
+        if not await db_health_checker.ensure_connection_cached_async():
             logging.error(f"Database connection not available for saving conversations")
             return 0, []
-        
-        updated_count = 0
-        updated_conversations: List[dict] = []
-        account = await MonitorAccount.objects.aget(id=int(self.account_id))
 
-        for msg in all_messages:
+        account = await self._get_account()
+
+        try:
+            # 一次 IN 查询取出已存在的 hash_id，仅用于区分新建/更新的日志
+            existing_hash_ids = {
+                h async for h in RealtimeConversation.objects.filter(
+                    account=account,
+                    hash_id__in=list(pending)
+                ).values_list('hash_id', flat=True)
+            }
+
             try:
+                await self._upsert_conversations(account, list(pending.values()))
+            except (IntegrityError, DataError) as e:
+                # 个别数据不合法会导致整条语句失败，退回到逐条写入，只丢弃有问题的那几条
+                logging.warning(f"Bulk upsert of {len(pending)} conversations failed, retrying one by one: {e}")
+                pending = await self._upsert_conversations_one_by_one(account, pending)
+        except Exception as e:
+            logging.error(f"Error saving conversations: {e}", exc_info=True)
+            return 0, []
 
-                hash_id = msg.get('hash_id', '')
+        # 汇总打印日志，不逐条格式化
+        updated_ids = [hash_id for hash_id in pending if hash_id in existing_hash_ids]
+        created_ids = [hash_id for hash_id in pending if hash_id not in existing_hash_ids]
+        if created_ids:
+            logging.info("✅ Created %d conversations: %s", len(created_ids), created_ids[:10])
+        if updated_ids:
+            logging.info("✅ Updated %d conversations: %s", len(updated_ids), updated_ids[:10])
 
-                # 解析时间字段（ISO 格式字符串 -> datetime）
-                last_activity_at_str = msg.get('last_activity_at')
-                if not last_activity_at_str:
-                    logging.warning(f"Conversation {hash_id} missing last_activity_at, skipping")
-                    continue
+        updated_conversations = list(pending.values())
+        return len(updated_conversations), updated_conversations
 
-                # 将 ISO 格式字符串转换为 datetime 对象
-                try:
-                    last_activity_at = datetime.fromisoformat(
-                        last_activity_at_str.replace('Z', '+00:00')
-                    )
-                    # 确保有时区信息
-                    if last_activity_at.tzinfo is None:
-                        last_activity_at = last_activity_at.replace(tzinfo=timezone.utc)
-                except (ValueError, AttributeError) as e:
-                    logging.warning(f"Failed to parse last_activity_at for {hash_id}: {e}")
-                    continue
+    @staticmethod
+    async def _upsert_conversations(account: MonitorAccount, conversations: List[dict]):
+        """一条 INSERT ... ON CONFLICT (account_id, hash_id) DO UPDATE 完成全部新建和更新"""
+        if RAW_SQL_BULK_WRITE and connection.vendor == 'postgresql':
+            await sync_to_async(_upsert_conversations_sql)(account.id, conversations)
+        else:
+            await RealtimeConversation.objects.abulk_create(
+                [RealtimeConversation(account=account, **conv_data) for conv_data in conversations],
+                update_conflicts=True,
+                unique_fields=['account', 'hash_id'],
+                update_fields=list(CONVERSATION_UPDATE_FIELDS),
+                batch_size=BULK_CREATE_BATCH_SIZE,
+            )
 
-                # 关键过滤：只处理时间 > db_max_time 的对话
-                if db_max_time and last_activity_at <= db_max_time:
-                    logging.debug(
-                        f"⏭️ Skipping old conversation: {hash_id} "
-                        f"(API: {last_activity_at} ≤ DB: {db_max_time})"
-                    )
-                    continue  # 跳过旧对话
-
-                # 解析其他时间字段
-                created_at = None
-                if msg.get('created_at'):
-                    try:
-                        created_at = datetime.fromisoformat(
-                            msg['created_at'].replace('Z', '+00:00')
-                        )
-                        if created_at.tzinfo is None:
-                            created_at = created_at.replace(tzinfo=timezone.utc)
-                    except (ValueError, AttributeError):
-                        pass
-
-                last_read_at = None
-                if msg.get('last_read_at'):
-                    try:
-                        last_read_at = datetime.fromisoformat(
-                            msg['last_read_at'].replace('Z', '+00:00')
-                        )
-                        if last_read_at.tzinfo is None:
-                            last_read_at = last_read_at.replace(tzinfo=timezone.utc)
-                    except (ValueError, AttributeError):
-                        pass
-
-                # 解析最后一条消息的时间
-                last_message = msg.get('last_message', {})
-                last_message_delivered_at = None
-                if last_message.get('delivered_at'):
-                    try:
-                        last_message_delivered_at = datetime.fromisoformat(
-                            last_message['delivered_at'].replace('Z', '+00:00')
-                        )
-                        if last_message_delivered_at.tzinfo is None:
-                            last_message_delivered_at = last_message_delivered_at.replace(tzinfo=timezone.utc)
-                    except (ValueError, AttributeError):
-                        pass
-                # 查询数据库中是否已存在该对话（基于 account 和 hash_id 一起做唯一性判断）
-                existing_conv = await RealtimeConversation.objects.filter(
-                    account=account,
-                    hash_id=hash_id
-                ).afirst()
-
-                # 准备对话数据
-                conv_data = {
-                    'hash_id': hash_id,
-                    'conversation_id': msg.get('conversation_id', ''),
-                    'public_id': msg.get('public_id', ''),
-                    'member_id': msg.get('member_id', ''),
-                    'conversation_url': msg.get('conversation_url', ''),
-                    'first_name': msg.get('first_name', ''),
-                    'last_name': msg.get('last_name', ''),
-                    'distance': msg.get('distance', ''),
-                    'unread_count': msg.get('unread_count', 0),
-                    'dialogue_created_at': created_at,
-                    'last_activity_at': last_activity_at,
-                    'last_read_at': last_read_at,
-                    'is_group_chat': msg.get('is_group_chat', False),
-                    'last_message_text': last_message.get('text', ''),
-                    'last_message_sender': last_message.get('sender', ''),
-                    'last_message_delivered_at': last_message_delivered_at,
-                    'source': msg.get('source', 'original'),
-                }
-
-                if existing_conv is None:
-                    # 不存在，创建新对话
-                    # 注意：hash_id 已经在 conv_data 中，不需要单独传递
-                    await RealtimeConversation.objects.acreate(
-                        account=account,
-                        **conv_data
-                    )
-                    logging.info(f"✅ Created new conversation: {hash_id}")
-                    updated_count += 1
-                    updated_conversations.append(conv_data)
-                else:
-                    # 已存在，更新对话信息
-                    existing_conv.conversation_id = conv_data['conversation_id']
-                    existing_conv.public_id = conv_data['public_id']
-                    existing_conv.member_id = conv_data['member_id']
-                    existing_conv.conversation_url = conv_data['conversation_url']
-                    existing_conv.first_name = conv_data['first_name']
-                    existing_conv.last_name = conv_data['last_name']
-                    existing_conv.distance = conv_data['distance']
-                    existing_conv.unread_count = conv_data['unread_count']
-                    existing_conv.dialogue_created_at = conv_data['dialogue_created_at']
-                    existing_conv.last_activity_at = conv_data['last_activity_at']
-                    existing_conv.last_read_at = conv_data['last_read_at']
-                    existing_conv.is_group_chat = conv_data['is_group_chat']
-                    existing_conv.last_message_text = conv_data['last_message_text']
-                    existing_conv.last_message_sender = conv_data['last_message_sender']
-                    existing_conv.last_message_delivered_at = conv_data['last_message_delivered_at']
-                    existing_conv.source = conv_data['source']
-
-                    # 使用 sync_to_async 包装同步的 save() 方法
-                    await sync_to_async(existing_conv.save)()
-                    logging.info(
-                        f"✅ Updated conversation: {hash_id} "
-                        f"(last_activity_at: {last_activity_at})"
-                    )
-                    updated_count += 1
-                    updated_conversations.append(conv_data)
+    async def _upsert_conversations_one_by_one(self, account: MonitorAccount, pending: Dict[str, dict]) -> Dict[str, dict]:
+        """逐条写入对话，写入失败的记录日志后跳过
 
-            except Exception as e:
-                logging.error(f"Error processing conversation: {e}", exc_info=True)
+        Returns:
+            Dict[str, dict]: 写入成功的对话
+        """
+        saved: Dict[str, dict] = {}
+        for hash_id, conv_data in pending.items():
+            try:
+                await self._upsert_conversations(account, [conv_data])
+            except (IntegrityError, DataError) as e:
+                logging.error(f"Error saving conversation {hash_id}: {e}")
                 continue
-
-        return updated_count, updated_conversations
+            saved[hash_id] = conv_data
+        return saved
 
     async def _get_max_message_time(self) -> Optional[datetime]:
         """获取当前账号在数据库中的最大消息时间
@@ -508,53 +684,37 @@ class DataCrawler:
 
         # 注意：RealtimeConversation 中的外键字段名为 account（db_column='account_id'），
         # 查询时应使用 account_id 或 account__id，而不是 account__account_id
-        try:
-            account_id = int(self.account_id)
-        except (TypeError, ValueError):
-            account_id = self.account_id
-
         result = await RealtimeConversation.objects.filter(
-            account_id=account_id
+            account_id=self._account_pk
         ).aaggregate(max_time=Max('last_activity_at'))
 
         max_time = result.get('max_time')
         return max_time
 
-    async def _fetch_api(self, page, url: str, max_retries: int = 3) -> dict:
-        """调用 LinkedIn API（带重试）"""
-        for attempt in range(max_retries):
-            try:
-                response = await page.evaluate(
-                    f"""
-                    async () => {{
-                        const response = await fetch('{url}', {{
-                            credentials: 'include'
-                        }});
-                        return await response.json();
-                    }}
-                    """
-                )
-                return response
-
-            except Exception as e:
-                wait_time = (2 ** attempt) * 1
-                logging.error(f"API fetch error (attempt {attempt + 1}): {e}")
+    @staticmethod
+    async def _lkp_request(lkpc, sender_email: str, method_name: str, params: dict) -> Optional[dict]:
+        """通过 LKP 代理调用 LinkedIn extended 接口，并发数受 LKP_REQUEST_SEMAPHORE 限制"""
+        async with LKP_REQUEST_SEMAPHORE:
+            return await lkpc.make_a_linked_in_request(
+                sender_email,
+                category='extended',
+                method_name=method_name,
+                params=params
+            )
 
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(wait_time)
-                    return {}
-                else:
-                    raise
-        return {}
+    @classmethod
+    async def _fetch_connections_page(cls, lkpc, sender_email: str, start: int, count: int) -> Optional[dict]:
+        """请求一页好友数据（get_connections_v2 接口）"""
+        return await cls._lkp_request(lkpc, sender_email, 'get_connections_v2', {"start": start, 'count': count})
 
     async def _get_latest_connection_profile_id(self) -> Optional[str]:
         """获取最新的好友 Profile ID（基于 hash_id 去重）"""
         # 确保数据库连接可用
-        if not await db_health_checker.ensure_connection_async():
+        if not await db_health_checker.ensure_connection_cached_async():
             logging.warning(f"Database connection not available for getting latest connection")
             return None
         
-        account = await MonitorAccount.objects.aget(id=int(self.account_id))
+        account = await self._get_account()
         latest = await RealtimeConnection.objects.filter(
             account=account
         ).order_by('-connected_at').afirst()
@@ -593,7 +753,7 @@ class DataCrawler:
     @staticmethod
     def _extract_profile_id(conn: dict) -> str:
         """提取 Profile ID"""
-        return conn.get('entityUrn', '').split(':')[-1]
+        return conn.get('entityUrn', '').rpartition(':')[2]
 
     @staticmethod
     def _extract_name(conn: dict) -> str:
@@ -608,76 +768,25 @@ class DataCrawler:
         return conn.get('connectedMember', {}).get('headline', '')
 
     @staticmethod
-    def _parse_timestamp(ts) -> Optional[datetime]:
-        """解析时间戳"""
-        if not ts:
-            return None
-        return datetime.fromtimestamp(ts / 1000)  # LinkedIn 使用毫秒时间戳
-
-    @staticmethod
-    def _normalize_timestamp_to_utc(timestamp: Optional[int]) -> Optional[int]:
-        """
-        将时间戳规范化为 UTC+0 时间戳（毫秒级）
+    def _parse_iso(value) -> Optional[datetime]:
+        """解析 ISO 8601 时间字符串，没有时区信息时按 UTC 处理；空值或解析失败返回 None
 
-        Args:
-            timestamp: 时间戳（可能是秒级或毫秒级，必须是 UTC 时间戳）
-
-        Returns:
-            UTC+0 的毫秒级时间戳，如果输入无效返回 None
+        Python 3.11 起 fromisoformat 原生支持 'Z' 后缀，不再需要先替换成 '+00:00'
         """
-        if timestamp is None or timestamp == 0:
+        if not value:
             return None
-
         try:
-            # 判断是毫秒级还是秒级时间戳
-            if timestamp > 1e10:
-                # 毫秒级时间戳，直接返回
-                return int(timestamp)
-            else:
-                # 秒级时间戳，转换为毫秒级
-                return int(timestamp * 1000)
-        except (ValueError, TypeError, OverflowError):
+            dt = datetime.fromisoformat(value)
+        except (ValueError, TypeError):
             return None
+        return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
 
     @staticmethod
-    def _timestamp_to_iso_utc(timestamp: Optional[int]) -> Optional[str]:
-        """
-        将时间戳转换为 ISO 8601 格式的 UTC+0 时间字符串
-
-        Args:
-            timestamp: 时间戳（可能是秒级或毫秒级，必须是 UTC 时间戳）
-
-        Returns:
-            ISO 8601 格式的时间字符串，例如：'2025-09-24T06:44:22+00:00'
-            如果输入无效返回 None
-        """
-        if timestamp is None or timestamp == 0:
-            return None
-
-        try:
-            # 规范化时间戳为毫秒级
-            normalized = DataCrawler._normalize_timestamp_to_utc(timestamp)
-            if normalized is None:
-                return None
-
-            # 转换为秒级时间戳
-            time_int = normalized / 1000
-
-            # 转换为 UTC 时间的 datetime 对象
-            dt = datetime.fromtimestamp(time_int, tz=timezone.utc)
-
-            # 格式化为 ISO 8601 格式，确保使用 +00:00 而不是 Z
-            iso_str = dt.isoformat()
-            # 将 Z 替换为 +00:00 以确保格式统一
-            if iso_str.endswith('Z'):
-                iso_str = iso_str[:-1] + '+00:00'
-            # 如果没有时区信息，添加 +00:00
-            elif '+' not in iso_str and '-' not in iso_str[-6:]:
-                iso_str = iso_str + '+00:00'
-
-            return iso_str
-        except (ValueError, TypeError, OverflowError, OSError):
+    def _parse_timestamp(ts) -> Optional[datetime]:
+        """解析时间戳"""
+        if not ts:
             return None
+        return datetime.fromtimestamp(ts / 1000)  # LinkedIn 使用毫秒时间戳
 
     def _parse_connection_data(self, connection_info: Dict) -> Optional[Dict]:
         """
@@ -701,25 +810,18 @@ class DataCrawler:
 
         # 提取 hash_id
         entity_urn = profile_dict.get('entityUrn', '')
-        hash_id = entity_urn.split(':')[-1] if entity_urn else None
+        hash_id = entity_urn.rpartition(':')[2] if entity_urn else None
 
         # 提取连接时间
         created_at = connection_info.get('createdAt')
         connected_at = None
         if created_at:
             if isinstance(created_at, int):
-                # 将时间戳转换为 ISO 8601 格式的 UTC+0 时间字符串
-                connected_at = self._timestamp_to_iso_utc(created_at)
+                # 直接转换为 UTC datetime，_save_connections_v2 不需要再从字符串解析，通知时统一序列化为 ISO 格式
+                connected_at = _timestamp_to_datetime_utc(created_at)
             elif isinstance(created_at, str):
-                # 如果已经是字符串，尝试解析并确保是 UTC+0 格式
-                try:
-                    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    if dt.tzinfo is None:
-                        # 如果没有时区信息，假设是 UTC
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    connected_at = dt.isoformat()
-                except (ValueError, AttributeError):
-                    connected_at = created_at
+                # 如果已经是字符串，尝试解析为 UTC datetime，解析失败保留原值
+                connected_at = self._parse_iso(created_at) or created_at
 
         # 构建返回数据
         return {
@@ -738,55 +840,114 @@ class DataCrawler:
             List[dict]: 保存的好友数据列表
         """
         # 确保数据库连接可用
-        if not await db_health_checker.ensure_connection_async():
+        if not await db_health_checker.ensure_connection_cached_async():
             logging.error(f"Database connection not available for saving connections")
             return []
         
         # 获取 account 对象
-        account = await MonitorAccount.objects.aget(id=int(self.account_id))
+        account = await self._get_account()
+
+        # 一次 IN 查询取出已入库的好友（唯一约束是 account + member_id，member_id 为空时无法靠冲突去重）
+        hash_ids = [conn_data['hash_id'] for conn_data in connections if conn_data.get('hash_id')]
+        existing = {}
+        if hash_ids:
+            existing = {
+                conn.hash_id: conn async for conn in RealtimeConnection.objects.filter(
+                    account=account,
+                    hash_id__in=hash_ids
+                ).only('id', 'hash_id', *CONNECTION_REFRESH_FIELDS)
+            }
 
-        objects = []
+        rows = []
         saved_data = []
+        changed = []
+        now = django_timezone.now()
 
         for conn_data in connections:
+            existing_conn = existing.get(conn_data.get('hash_id'))
+            if existing_conn is not None:
+                # 已存在的好友不再通知，只刷新 LinkedIn 上变化了的资料字段
+                dirty = False
+                for field in CONNECTION_REFRESH_FIELDS:
+                    value = conn_data.get(field)
+                    if value is not None and getattr(existing_conn, field) != value:
+                        setattr(existing_conn, field, value)
+                        dirty = True
+                if dirty:
+                    changed.append(existing_conn)
+                continue
+
             # 转换 connected_at 字符串为 datetime 对象
-            connected_at = None
-            if conn_data.get('connected_at'):
-                try:
-                    connected_at_str = conn_data['connected_at']
-                    if isinstance(connected_at_str, str):
-                        # 解析 ISO 8601 格式的字符串
-                        connected_at = datetime.fromisoformat(
-                            connected_at_str.replace('Z', '+00:00'))
-                    elif isinstance(connected_at_str, datetime):
-                        connected_at = connected_at_str
-                except (ValueError, AttributeError):
+            connected_at = conn_data.get('connected_at')
+            if isinstance(connected_at, str):
+                # 解析 ISO 8601 格式的字符串
+                connected_at = self._parse_iso(connected_at)
+                if connected_at is None:
                     logging.warning(
                         f"Failed to parse connected_at: {conn_data.get('connected_at')}")
+            elif not isinstance(connected_at, datetime):
+                connected_at = None
+
+            rows.append({
+                'first_name': conn_data.get('first_name'),
+                'last_name': conn_data.get('last_name'),
+                'headline': conn_data.get('headline'),
+                'public_id': conn_data.get('public_id'),
+                'hash_id': conn_data.get('hash_id'),
+                'member_id': conn_data.get('member_id'),
+                'source': conn_data.get('source', 'original'),
+                'connected_at': connected_at or now,
+            })
+            saved_data.append(conn_data)
 
-            conn_obj = RealtimeConnection(
-                account=account,
-                first_name=conn_data.get('first_name'),
-                last_name=conn_data.get('last_name'),
-                headline=conn_data.get('headline'),
-                public_id=conn_data.get('public_id'),
-                hash_id=conn_data.get('hash_id'),
-                member_id=conn_data.get('member_id'),
-                source=conn_data.get('source', 'original'),
-                connected_at=connected_at or django_timezone.now()
+        if changed:
+            await RealtimeConnection.objects.abulk_update(
+                changed,
+                fields=list(CONNECTION_REFRESH_FIELDS),
+                batch_size=BULK_CREATE_BATCH_SIZE
             )
-            objects.append(conn_obj)
-            saved_data.append(conn_data)
+            logging.info(f"Refreshed {len(changed)} existing connections")
 
-        # 使用 bulk_create 批量保存，忽略冲突（基于 unique_together: account + member_id）
-        await sync_to_async(RealtimeConnection.objects.bulk_create)(
-            objects,
-            ignore_conflicts=True
-        )
+        if not rows:
+            return []
+
+        # 批量保存，忽略冲突（基于 unique_together: account + member_id）
+        if RAW_SQL_BULK_WRITE and connection.vendor == 'postgresql':
+            await sync_to_async(_insert_connections_sql)(account.id, rows)
+        else:
+            await sync_to_async(RealtimeConnection.objects.bulk_create)(
+                [RealtimeConnection(account=account, **row) for row in rows],
+                batch_size=BULK_CREATE_BATCH_SIZE,
+                ignore_conflicts=True
+            )
 
         return saved_data
 
-    async def _clear_notification(self, page, notification_source: str):
+    async def return_to_feed(self, page):
+        """清除红点后返回 Feed 页面，同一批事件全部处理完后由 EventHandler 调用一次"""
+        async with self._page_lock:
+            if not self._off_feed:
+                return
+            try:
+                logging.info("Navigating back to Feed page")
+                await page.goto("https://www.linkedin.com/feed/", wait_until='domcontentloaded', timeout=60000)
+                self._off_feed = False
+                logging.info("✅ Navigated back to Feed page after clearing notification")
+            except Exception as nav_err:
+                logging.error("❌ Failed to navigate back to Feed page: %s", nav_err)
+
+    def _schedule_clear_notification(self, notification_source: str):
+        """记录需要清除的红点，抓取结束后由 clear_pending_notifications 导航清除"""
+        if notification_source not in self._pending_clears:
+            self._pending_clears.append(notification_source)
+
+    async def clear_pending_notifications(self, page):
+        """依次清除抓取过程中记录的红点，和其他导航互斥；同一批事件全部抓取完后由 EventHandler 调用"""
+        async with self._page_lock:
+            while self._pending_clears:
+                await self._navigate_to_clear_notification(page, self._pending_clears.pop(0))
+
+    async def _navigate_to_clear_notification(self, page, notification_source: str):
         """清除红点（通过导航到目标页面）
 
         Args:
@@ -794,58 +955,61 @@ class DataCrawler:
             notification_source: 'my_network' 或 'message'，决定跳转到哪个页面
         """
         try:
-            logging.info(f'开始清除红点: {notification_source}')
+            logging.info('开始清除红点: %s', notification_source)
             
+            # 延迟导入，account_monitor 依赖本模块
+            from realtime_monitor.core.account_monitor import AccountMonitor
+
             # 确定目标 URL（直接导航，避免重定向问题）
             if notification_source == 'my_network':
                 target_url = 'https://www.linkedin.com/mynetwork/grow/'
                 wait_selector = 'button[aria-label*="Connect"]'  # Grow 页面的特征元素
                 wait_description = "Connect button on Grow page"
+                badge_key = 'my_network'
             else:
                 target_url = 'https://www.linkedin.com/messaging/'
                 wait_selector = 'div[class*="msg-conversations-container"]'
                 wait_description = "Messaging conversations container"
+                badge_key = 'messaging'
             
-            # 直接导航到目标页面
+            # 直接导航到目标页面，DOM 解析完成即返回，不等 load 事件
+            self._off_feed = True
             try:
-                logging.info(f"Navigating to {target_url}")
-                await page.goto(target_url, timeout=60000)
-                await page.wait_for_load_state('domcontentloaded', timeout=10000)
-                logging.info(f"✅ Navigated to {target_url}")
+                logging.info("Navigating to %s", target_url)
+                await page.goto(target_url, wait_until='domcontentloaded', timeout=60000)
+                logging.info("✅ Navigated to %s", target_url)
             except Exception as nav_err:
-                logging.error(f"❌ Failed to navigate to {target_url}: {nav_err}")
+                logging.error("❌ Failed to navigate to %s: %s", target_url, nav_err)
                 pass
             
             # 等待页面特征元素加载（确认页面加载成功）
             try:
-                await page.wait_for_selector(wait_selector, timeout=10000)
-                logging.info(f"✅ Page loaded successfully (found {wait_description})")
+                await page.wait_for_selector(wait_selector, state='attached', timeout=10000)
+                logging.info("✅ Page loaded successfully (found %s)", wait_description)
             except Exception as wait_err:
                 # 即使找不到特征元素，也继续（页面可能已加载，只是元素结构变了）
                 logging.warning(
-                    f"⚠️ Timeout waiting for {wait_description}: {wait_err}. "
-                    f"Page might still be loaded, continuing..."
+                    "⚠️ Timeout waiting for %s: %s. Page might still be loaded, continuing...",
+                    wait_description, wait_err
                 )
             
-            # 等待一下，确保红点被清除
-            await asyncio.sleep(2)
+            # 等待红点消失（页面注入了 window.__bm），红点已清除时立即返回，最多等 3 秒
+            try:
+                await page.wait_for_function(
+                    CLEARED_BADGE_SCRIPT,
+                    arg={badge_key: AccountMonitor.XPATHS[badge_key]},
+                    timeout=3000
+                )
+            except Exception as wait_err:
+                logging.debug("Badge still present after navigation: %s", wait_err)
             
             # 验证当前 URL（调试用）
             current_url = page.url
-            logging.info(f"Current URL after navigation: {current_url}")
-            
-            # 返回 Feed 页面
-            try:
-                logging.info("Navigating back to Feed page")
-                await page.goto("https://www.linkedin.com/feed/", timeout=60000)
-                await page.wait_for_load_state('domcontentloaded', timeout=10000)
-                logging.info("✅ Navigated back to Feed page after clearing notification")
-            except Exception as nav_err:
-                logging.error(f"❌ Failed to navigate back to Feed page: {nav_err}")
+            logging.info("Current URL after navigation: %s", current_url)
 
         except Exception as e:
             logging.error(
-                f"❌ Error clearing {notification_source} notification: {e}",
+                "❌ Error clearing %s notification: %s", notification_source, e,
                 exc_info=True
             )
 
@@ -858,10 +1022,11 @@ class DataCrawler:
         """
         if not data:
             return False
+        data_count = len(data)
 
         # 从配置中获取 Callback 接口 URL（使用 sync_to_async 避免阻塞事件循环）
         try:
-            account_model = await MonitorAccount.objects.aget(id=int(self.account_id))
+            account_model = await self._get_account()
             callback_url = account_model.callback_url
             callback_token = account_model.callback_token
             hash_id = account_model.hash_id
@@ -873,80 +1038,47 @@ class DataCrawler:
             if callback_token:
                 callback_headers["X-Callback-Token"] = callback_token
         except MonitorAccount.DoesNotExist:
-            logging.error(f"账号ID：{self.account_id} 不存在")
+            logging.error("账号ID：%s 不存在", self.account_id)
             return False
         
-        # 准备通知数据（需要序列化 datetime 对象）
-        def serialize_value(value):
-            """递归序列化值，将 datetime 对象转换为 ISO 格式字符串"""
-            if isinstance(value, datetime):
-                return value.isoformat()
-            elif isinstance(value, dict):
-                return {k: serialize_value(v) for k, v in value.items()}
-            elif isinstance(value, (list, tuple)):
-                return [serialize_value(item) for item in value]
-            else:
-                return value
-        
-        def serialize_data(data_list):
-            """序列化数据列表，处理所有层级的 datetime 对象"""
-            return [serialize_value(item) for item in data_list]
-        
-        serialized_data = serialize_data(data)
-        
+        # 准备通知数据：orjson 直接把 datetime 序列化为 ISO 8601 格式，不需要先遍历转换
         if source == 'message':
-            json_data = {'conversations': serialized_data, 'profile_id': hash_id, 'type':'conversations'}
+            json_data = {'conversations': data, 'profile_id': hash_id, 'type':'conversations'}
             notify_type = '消息列表'
         else:
-            json_data = {'connections': serialized_data, 'profile_id': hash_id, 'type':'connections'}
+            json_data = {'connections': data, 'profile_id': hash_id, 'type':'connections'}
             notify_type = '好友列表'
+        body = orjson.dumps(json_data)
         
         # 数据量检查（如果数据量很大，记录警告）
-        if len(data) > 100:
+        if data_count > 100:
             logging.warning(
-                f"准备发送大量数据到 Callback URL，"
-                f"数据量：{len(data)} 条，可能导致请求超时或失败"
+                "准备发送大量数据到 Callback URL，数据量：%s 条，可能导致请求超时或失败", data_count
             )
         
         # 如果配置了回调 URL，尝试通知
         if callback_url:
             # 记录请求信息（用于调试）
             logging.info(
-                f"准备通知 Business 方{notify_type}数据，"
-                f"URL: {callback_url}，"
-                f"数据量: {len(data)} 条，"
-                f"是否包含 Token: {bool(callback_token)}"
+                "准备通知 Business 方%s数据，URL: %s，数据量: %s 条，是否包含 Token: %s",
+                notify_type, callback_url, data_count, bool(callback_token)
             )
             
+            client = get_callback_client()
+            last_error = None
             for retry in range(5):
                 try:
-                    # 使用异步 HTTP 请求（避免阻塞事件循环）
-                    loop = asyncio.get_running_loop()
-                    
-                    # 在 executor 中执行请求（包含 JSON 序列化）
-                    def make_request():
-                        try:
-                            return requests.post(
-                                callback_url, 
-                                json=json_data, 
-                                headers=callback_headers,
-                                timeout=10
-                            )
-                        except (TypeError, ValueError) as json_err:
-                            # 捕获 JSON 序列化错误
-                            logging.error(
-                                f"JSON 序列化失败: {json_err}，"
-                                f"数据类型检查：{type(json_data)}",
-                                exc_info=True
-                            )
-                            raise
-                    
-                    response = await loop.run_in_executor(None, make_request)
-                    
+                    # 直接在事件循环上发送异步请求，重试和多次通知复用同一个连接池
+                    response = await client.post(
+                        callback_url,
+                        content=body,
+                        headers=callback_headers
+                    )
+
                     if 200 <= response.status_code < 300:
                         logging.info(
-                            f"通知 Business 方{notify_type}数据更新成功，"
-                            f"账号ID：{self.account_id}，更新数量：{len(data)}"
+                            "通知 Business 方%s数据更新成功，账号ID：%s，更新数量：%s",
+                            notify_type, self.account_id, data_count
                         )
                         return True
                     else:
@@ -957,52 +1089,54 @@ class DataCrawler:
                             response_text = f"无法获取响应内容: {text_err}"
                         
                         logging.warning(
-                            f"通知 Business 方失败，状态码：{response.status_code}，"
-                            f"响应内容：{response_text}，"
-                            f"重试次数：{retry + 1}/5"
+                            "通知 Business 方失败，状态码：%s，响应内容：%s，重试次数：%s/5",
+                            response.status_code, response_text, retry + 1
                         )
-                except requests.exceptions.Timeout as e:
+                except httpx.TimeoutException as e:
+                    last_error = e
                     logging.error(
-                        f"通知 Business 方超时：{e}，重试次数：{retry + 1}/5",
-                        exc_info=True
+                        "通知 Business 方超时：%s (%s)，重试次数：%s/5", e, e.__class__.__name__, retry + 1
                     )
-                except requests.exceptions.ConnectionError as e:
+                except httpx.NetworkError as e:
+                    last_error = e
                     logging.error(
-                        f"通知 Business 方连接错误：{e}，重试次数：{retry + 1}/5",
-                        exc_info=True
+                        "通知 Business 方连接错误：%s (%s)，重试次数：%s/5", e, e.__class__.__name__, retry + 1
                     )
-                except requests.exceptions.RequestException as e:
+                except httpx.HTTPError as e:
+                    last_error = e
                     logging.error(
-                        f"通知 Business 方请求异常：{e}，重试次数：{retry + 1}/5",
-                        exc_info=True
+                        "通知 Business 方请求异常：%s (%s)，重试次数：%s/5", e, e.__class__.__name__, retry + 1
                     )
                 except Exception as e:
+                    last_error = e
                     logging.error(
-                        f"通知 Business 方未知异常：{e}，重试次数：{retry + 1}/5",
-                        exc_info=True
+                        "通知 Business 方未知异常：%s (%s)，重试次数：%s/5", e, e.__class__.__name__, retry + 1
                     )
                 
-                # 如果不是最后一次重试，等待后重试
+                # 如果不是最后一次重试，指数退避 + 随机抖动后重试，避免多个账号同时重试
                 if retry < 4:
-                    await asyncio.sleep(5)  # 使用异步 sleep
+                    await asyncio.sleep(min(30, 2 ** retry) + random.uniform(0, 1))
             
-            # 所有重试失败，发送告警
+            # 所有重试失败，发送告警；重试中只记一行摘要，完整堆栈只在这里记录一次
             logging.error(
-                f"通知 Business 方{notify_type}数据更新失败（5次重试均失败），"
-                f"账号ID：{self.account_id}，更新数量：{len(data)}"
+                "通知 Business 方%s数据更新失败（5次重试均失败），账号ID：%s，更新数量：%s",
+                notify_type, self.account_id, data_count,
+                exc_info=last_error
             )
-            await sync_to_async(send_wechat_message)(
+            await send_wechat_message_async(
+                get_callback_client(),
                 f'数据监控-{notify_type}数据更新通知失败，'
-                f'账号ID：{self.account_id}，更新数量：{len(data)}',
+                f'账号ID：{self.account_id}，更新数量：{data_count}',
                 key=WechatRobotKey.TEST_WECHAT_ROBOT_KEY.value
             )
             return False
         else:
             # 未配置回调 URL，发送微信通知
-            logging.warning(f"账号ID：{self.account_id} 未配置 callback_url")
-            await sync_to_async(send_wechat_message)(
+            logging.warning("账号ID：%s 未配置 callback_url", self.account_id)
+            await send_wechat_message_async(
+                get_callback_client(),
                 f'数据监控-{notify_type}数据更新通知（未配置回调URL），'
-                f'账号ID：{self.account_id}，更新数量：{len(data)}',
+                f'账号ID：{self.account_id}，更新数量：{data_count}',
                 key=WechatRobotKey.TEST_WECHAT_ROBOT_KEY.value
             )
             return False
@@ -6,6 +6,8 @@
 
 import logging
 import asyncio
+import random
+import time
 from functools import wraps
 from typing import Optional, Callable, Any
 from asgiref.sync import sync_to_async
@@ -26,7 +28,20 @@ class DatabaseHealthChecker:
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        # 最近一次确认连接可用的时间（time.monotonic），供 ensure_connection_cached_async 复用
+        self._last_ok_at: Optional[float] = None
+        # 异步版本直接复用同步实现，包装一次即可；Django 连接是线程局部的，必须保持 thread_sensitive
+        # 让检查/重连和 ORM 查询落在同一个线程的同一个连接上
+        self._check_connection_async = sync_to_async(self.check_connection)
+        self._reconnect_async = sync_to_async(self.reconnect)
     
+    def backoff_delay(self, attempt: int, cap: float = 30.0) -> float:
+        """
+        第 attempt 次重试前的等待时间：以 retry_delay 为基数指数退避，加随机抖动，
+        避免数据库恢复时多个监听进程同时重连
+        """
+        return min(cap, self.retry_delay * (2 ** attempt)) + random.uniform(0, self.retry_delay)
+
     def check_connection(self) -> bool:
         """
         检查数据库连接是否正常（同步版本，仅用于同步上下文）
@@ -35,11 +50,12 @@ class DatabaseHealthChecker:
             bool: 连接正常返回 True，否则返回 False
         """
         try:
-            # 尝试执行一个简单的查询
-            connection.ensure_connection()
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-            return True
+            # 还没有连接时直接建立，能连上即说明可用，不需要再查询
+            if connection.connection is None:
+                connection.ensure_connection()
+                return True
+            # 已有连接时用后端自带的 is_usable 检查连接句柄
+            return connection.is_usable()
         except (OperationalError, InterfaceError, DatabaseError) as e:
             logging.warning(f"Database connection check failed: {e}")
             return False
@@ -54,22 +70,7 @@ class DatabaseHealthChecker:
         Returns:
             bool: 连接正常返回 True，否则返回 False
         """
-        @sync_to_async
-        def _check():
-            try:
-                # 尝试执行一个简单的查询
-                connection.ensure_connection()
-                with connection.cursor() as cursor:
-                    cursor.execute("SELECT 1")
-                return True
-            except (OperationalError, InterfaceError, DatabaseError) as e:
-                logging.warning(f"Database connection check failed: {e}")
-                return False
-            except Exception as e:
-                logging.error(f"Unexpected error during database connection check: {e}", exc_info=True)
-                return False
-        
-        return await _check()
+        return await self._check_connection_async()
     
     def reconnect(self) -> bool:
         """
@@ -100,24 +101,7 @@ class DatabaseHealthChecker:
         Returns:
             bool: 重连成功返回 True，否则返回 False
         """
-        @sync_to_async
-        def _reconnect():
-            try:
-                logging.info("Attempting to reconnect to database...")
-                # 关闭现有连接
-                connection.close()
-                # 尝试建立新连接
-                connection.ensure_connection()
-                logging.info("Database reconnection successful")
-                return True
-            except (OperationalError, InterfaceError, DatabaseError) as e:
-                logging.error(f"Database reconnection failed: {e}")
-                return False
-            except Exception as e:
-                logging.error(f"Unexpected error during database reconnection: {e}", exc_info=True)
-                return False
-        
-        return await _reconnect()
+        return await self._reconnect_async()
     
     def ensure_connection(self) -> bool:
         """
@@ -139,8 +123,7 @@ class DatabaseHealthChecker:
             
             # 如果不是最后一次尝试，等待后重试
             if attempt < self.max_retries - 1:
-                import time
-                time.sleep(self.retry_delay)
+                time.sleep(self.backoff_delay(attempt))
         
         logging.error(f"Failed to reconnect to database after {self.max_retries} attempts")
         return False
@@ -165,11 +148,29 @@ class DatabaseHealthChecker:
             
             # 如果不是最后一次尝试，等待后重试
             if attempt < self.max_retries - 1:
-                await asyncio.sleep(self.retry_delay)
+                await asyncio.sleep(self.backoff_delay(attempt))
         
         logging.error(f"Failed to reconnect to database after {self.max_retries} attempts")
         return False
 
+    async def ensure_connection_cached_async(self, ttl: float = 5.0) -> bool:
+        """
+        带短期缓存的 ensure_connection_async：ttl 秒内已确认过连接可用时直接返回 True，
+        同一轮抓取中多个方法连续调用时只做一次探测；失败结果不缓存
+
+        Args:
+            ttl: 缓存有效期（秒）
+
+        Returns:
+            bool: 连接可用返回 True，否则返回 False
+        """
+        if self._last_ok_at is not None and time.monotonic() - self._last_ok_at < ttl:
+            return True
+
+        ok = await self.ensure_connection_async()
+        self._last_ok_at = time.monotonic() if ok else None
+        return ok
+
 
 # 全局数据库健康检查器实例
 db_health_checker = DatabaseHealthChecker(max_retries=3, retry_delay=2.0)
@@ -277,19 +278,19 @@ def with_db_reconnect_async(max_retries: int = 3, retry_delay: float = 1.0):
 async def periodic_db_health_check(interval: int = 60):
     """
     定期检查数据库连接健康状态
+
+    一个间隔内已经有其他调用确认过连接可用时跳过本次探测；间隔加 10% 随机抖动，避免多个进程同时探测
     
     Args:
         interval: 检查间隔（秒）
     """
     while True:
         try:
-            # 使用异步版本的检查方法
-            if not await db_health_checker.check_connection_async():
-                logging.warning("Periodic health check: Database connection is unhealthy")
-                await db_health_checker.ensure_connection_async()
-            else:
+            if await db_health_checker.ensure_connection_cached_async(ttl=interval):
                 logging.debug("Periodic health check: Database connection is healthy")
+            else:
+                logging.warning("Periodic health check: Database connection is unhealthy")
         except Exception as e:
             logging.error(f"Error during periodic database health check: {e}", exc_info=True)
         
-        await asyncio.sleep(interval)
+        await asyncio.sleep(interval + random.uniform(0, interval * 0.1))
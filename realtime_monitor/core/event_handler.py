@@ -1,18 +1,6 @@
 import asyncio
-import os
-import sys
 import time
 import logging
-import math
-
-import django
-
-# 项目根目录路径（根据你的实际结构调整）
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.append(BASE_DIR)
-
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "linkedin_realtime_monitor.settings")  # 替换成你的 settings 路径
-django.setup()
 
 from realtime_monitor.core.throttler import Throttler
 from realtime_monitor.core.data_crawler import DataCrawler
@@ -27,6 +15,8 @@ class EventHandler:
         self.account_id = account_id
         self.throttler = Throttler(account_id)
         self.crawler = DataCrawler(account_id)
+        # 同类型事件串行，不同类型（好友/消息）的抓取可以并发执行
+        self._locks = {'my_network': asyncio.Lock(), 'messaging': asyncio.Lock()}
 
     async def handle_event(
             self,
@@ -48,19 +38,83 @@ class EventHandler:
 
         # 日志打印：事件触发
         logger.info(
-            f"[Event Triggered] account={self.account_id}, "
-            f"type={event_type}, source={source}, priority={priority}, badge_count={badge_count}"
+            "[Event Triggered] account=%s, type=%s, source=%s, priority=%s, badge_count=%s",
+            self.account_id, event_type, source, priority, badge_count
         )
 
         try:
             # 节流检查
             if not await self.throttler.can_proceed(priority):
                 logger.info(
-                    f"[Event Throttled] account={self.account_id}, "
-                    f"type={event_type}, priority={priority}"
+                    "[Event Throttled] account=%s, type=%s, priority=%s",
+                    self.account_id, event_type, priority
                 )
                 return
+        except Exception as e:
+            logger.error(
+                "[Event Failed] account=%s, type=%s, error=%s",
+                self.account_id, event_type, e,
+                exc_info=True
+            )
+            return
+
+        await self._process_event(event_type, source, badge_count)
+        await self.crawler.clear_pending_notifications(page)
+        await self.crawler.return_to_feed(page)
+
+    async def handle_events(self, page, events: list[tuple[str, str, str, int]]):
+        """批量处理事件，整批只做一次节流检查
+
+        Args:
+            page: Playwright page 对象
+            events: [(event_type, source, priority, badge_count), ...]，节流按批内最高优先级判断
+        """
+        if not events:
+            return
+
+        for event_type, source, priority, badge_count in events:
+            logger.info(
+                "[Event Triggered] account=%s, type=%s, source=%s, priority=%s, badge_count=%s",
+                self.account_id, event_type, source, priority, badge_count
+            )
 
+        priority = 'high' if any(event[2] == 'high' for event in events) else 'low'
+        event_types = [event[0] for event in events]
+        try:
+            if not await self.throttler.can_proceed(priority):
+                logger.info(
+                    "[Event Throttled] account=%s, types=%s, priority=%s",
+                    self.account_id, event_types, priority
+                )
+                return
+        except Exception as e:
+            logger.error(
+                "[Event Failed] account=%s, types=%s, error=%s",
+                self.account_id, event_types, e,
+                exc_info=True
+            )
+            return
+
+        # 不同类型的事件并发抓取（只请求接口和写库，不操作页面）
+        await asyncio.gather(*(
+            self._process_event(event_type, source, badge_count)
+            for event_type, source, _, badge_count in events
+        ))
+        # 抓取全部结束后再依次导航清除红点，多个事件都清除了红点时只在最后返回一次 Feed 页面
+        await self.crawler.clear_pending_notifications(page)
+        await self.crawler.return_to_feed(page)
+
+    async def _process_event(self, event_type: str, source: str, badge_count: int):
+        """执行单个事件的抓取，异常只记录日志"""
+        lock = self._locks.get(event_type)
+        if lock is None:
+            return
+        async with lock:
+            await self._crawl(event_type, source, badge_count)
+
+    async def _crawl(self, event_type: str, source: str, badge_count: int):
+        """按事件类型执行抓取"""
+        try:
             # 执行抓取
             start_time = time.time()
 
@@ -69,36 +123,34 @@ class EventHandler:
                 if source == 'dom_monitor' and badge_count > 0:
                     # DOM 监听：根据红点数量计算翻页次数
                     # 每页40条，计算需要的页数（向上取整）
-                    max_pages = math.ceil(badge_count / 40)
+                    max_pages = (badge_count + 39) // 40
                     logger.info(
-                        f"[DOM Monitor] badge_count={badge_count}, calculated max_pages={max_pages}"
+                        "[DOM Monitor] badge_count=%s, calculated max_pages=%s", badge_count, max_pages
                     )
                 elif source == 'fallback_polling':
                     # Fallback 流程：最多2页
                     max_pages = 2
-                    logger.info(f"[Fallback Polling] max_pages limited to 2")
+                    logger.info("[Fallback Polling] max_pages limited to 2")
                 else:
                     # 其他情况：不限制翻页（保持原有逻辑）
                     max_pages = 5
-                    logger.info(f"[Other Source] no page limit")
+                    logger.info("[Other Source] no page limit")
                 
-                result_count = await self.crawler.crawl_connections(page, max_pages=max_pages)
+                result_count = await self.crawler.crawl_connections(max_pages=max_pages)
                 logger.info(
-                    f"[Event Success] account={self.account_id}, "
-                    f"type={event_type}, fetched={result_count} connections, "
-                    f"duration={time.time() - start_time:.2f}s"
+                    "[Event Success] account=%s, type=%s, fetched=%s connections, duration=%.2fs",
+                    self.account_id, event_type, result_count, time.time() - start_time
                 )
             elif event_type == 'messaging':
-                result_count = await self.crawler.crawl_conversations(page)
+                result_count = await self.crawler.crawl_conversations()
                 logger.info(
-                    f"[Event Success] account={self.account_id}, "
-                    f"type={event_type}, updated={result_count} conversations, "
-                    f"duration={time.time() - start_time:.2f}s"
+                    "[Event Success] account=%s, type=%s, updated=%s conversations, duration=%.2fs",
+                    self.account_id, event_type, result_count, time.time() - start_time
                 )
 
         except Exception as e:
             logger.error(
-                f"[Event Failed] account={self.account_id}, "
-                f"type={event_type}, error={str(e)}",
+                "[Event Failed] account=%s, type=%s, error=%s",
+                self.account_id, event_type, e,
                 exc_info=True
             )
\ No newline at end of file
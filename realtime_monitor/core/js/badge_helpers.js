@@ -0,0 +1,196 @@
+// 红点检查的页面内辅助函数，由 AccountMonitor 通过 page.add_init_script 在每次页面加载时注入，
+// V8 每个页面只编译一次，Python 侧通过 window.__bm.findBadges(xpaths, debug) 调用
+(() => {
+    // 辅助函数：检查元素是否可见（宽松检查）
+    function isElementVisible(element) {
+        if (!element) return false;
+
+        const style = window.getComputedStyle(element);
+        const rect = element.getBoundingClientRect();
+
+        // 只检查最基本的隐藏方式
+        if (style.display === 'none') return false;
+        if (style.visibility === 'hidden') return false;
+
+        // 检查尺寸（宽松一点，只要有一点尺寸就认为可见）
+        if (rect.width < 1 && rect.height < 1) return false;
+
+        return true;
+    }
+
+    // 辅助函数：提取数字（宽松版本）
+    function extractNumber(text) {
+        if (!text) return null;
+
+        const cleaned = text.trim();
+        if (!cleaned) return null;
+
+        // 尝试多种匹配方式
+        // 1. 纯数字: "3", " 5 "
+        let pureMatch = cleaned.match(/^\s*(\d+)\s*$/);
+        if (pureMatch) {
+            return parseInt(pureMatch[1]);
+        }
+
+        // 2. 数字在开头: "5 new", "3+"
+        let startMatch = cleaned.match(/^(\d+)/);
+        if (startMatch) {
+            return parseInt(startMatch[1]);
+        }
+
+        // 3. 提取任何数字
+        let anyMatch = cleaned.match(/\d+/);
+        if (anyMatch) {
+            return parseInt(anyMatch[0]);
+        }
+
+        return null;
+    }
+
+    // 辅助函数：按 XPath 查找元素，结果缓存在页面上，元素仍挂在文档中时直接复用，避免每次遍历整个文档
+    function resolveXPath(xpath) {
+        const cache = window.__badgeElements || (window.__badgeElements = {});
+        const cached = cache[xpath];
+        if (cached && cached.isConnected) return cached;
+        const element = document.evaluate(
+            xpath,
+            document,
+            null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE,
+            null
+        ).singleNodeValue;
+        cache[xpath] = element;
+        return element;
+    }
+
+    function findBadge(xpath, debug) {
+        try {
+            // 方法1: 使用 XPath 查找（主要方法）
+            const xpathElement = resolveXPath(xpath);
+
+            if (xpathElement && isElementVisible(xpathElement)) {
+                const text = xpathElement.textContent || xpathElement.innerText || '';
+                const number = extractNumber(text);
+
+                if (number !== null && number > 0) {
+                    const style = window.getComputedStyle(xpathElement);
+                    const rect = xpathElement.getBoundingClientRect();
+
+                    return {
+                        found: true,
+                        count: number,
+                        method: 'xpath',
+                        debug: debug && {
+                            tagName: xpathElement.tagName,
+                            className: xpathElement.className,
+                            textContent: text.trim().substring(0, 100),
+                            display: style.display,
+                            visibility: style.visibility,
+                            opacity: style.opacity,
+                            width: rect.width,
+                            height: rect.height
+                        }
+                    };
+                } else {
+                    // XPath 找到了元素，但没有有效数字
+                    return {
+                        found: false,
+                        count: 0,
+                        reason: 'xpath_found_but_no_number',
+                        debug: debug && {
+                            textContent: text.substring(0, 100),
+                            extractedNumber: number
+                        }
+                    };
+                }
+            }
+
+            // 方法2: XPath 失败，尝试备用方案（查找包含特定 href 的链接下的数字）
+            const hrefPattern = xpath.includes('mynetwork') ? 'mynetwork' : 'messaging';
+            const links = Array.from(document.querySelectorAll('a')).filter(a => {
+                const href = a.getAttribute('href') || '';
+                return href.includes(hrefPattern);
+            });
+
+            for (const link of links) {
+                // 在链接中查找包含数字的可见子元素
+                const allSpans = link.querySelectorAll('span');
+
+                for (const span of allSpans) {
+                    if (!isElementVisible(span)) continue;
+
+                    const text = span.textContent || span.innerText || '';
+                    const number = extractNumber(text);
+
+                    if (number !== null && number > 0) {
+                        // 额外验证：这个 span 应该比较小（红点通常很小）
+                        const rect = span.getBoundingClientRect();
+                        // 如果宽度或高度在 10-100px 之间，更可能是红点
+                        const style = window.getComputedStyle(span);
+
+                        return {
+                            found: true,
+                            count: number,
+                            method: 'fallback_span',
+                            debug: debug && {
+                                tagName: span.tagName,
+                                className: span.className,
+                                textContent: text.trim().substring(0, 100),
+                                width: rect.width,
+                                height: rect.height,
+                                backgroundColor: style.backgroundColor
+                            }
+                        };
+                    }
+                }
+            }
+
+            // 都没找到
+            return {
+                found: false,
+                count: 0,
+                reason: 'all_methods_failed',
+                debug: debug && {
+                    xpath: xpath,
+                    xpathElementFound: xpathElement !== null,
+                    linksFound: links.length
+                }
+            };
+
+        } catch (error) {
+            return { 
+                found: false, 
+                count: 0, 
+                reason: 'exception',
+                error: error.message 
+            };
+        }
+    }
+
+    // 消息红点：元素可见且文本中带数字即认为有红点
+    function findMessagingBadge(xpath) {
+        try {
+            const element = resolveXPath(xpath);
+            if (!element || !isElementVisible(element)) {
+                return { found: false, count: 0, reason: 'messaging_element_not_visible' };
+            }
+            const text = element.innerText || element.textContent || '';
+            const match = text.match(/\d+/);
+            const count = match ? parseInt(match[0]) : 0;
+            return { found: count > 0, count: count, method: 'messaging_xpath' };
+        } catch (error) {
+            return { found: false, count: 0, reason: 'exception', error: error.message };
+        }
+    }
+
+    // 一次检查所有红点，返回 {key: {found, count, ...}}；debug 为 false 时不返回 debug 字段
+    function findBadges(xpaths, debug) {
+        const results = {};
+        for (const [key, xpath] of Object.entries(xpaths)) {
+            results[key] = key === 'messaging' ? findMessagingBadge(xpath) : findBadge(xpath, debug);
+        }
+        return results;
+    }
+
+    window.__bm = { isElementVisible, extractNumber, resolveXPath, findBadge, findMessagingBadge, findBadges };
+})();
@@ -3,13 +3,18 @@ import os
 import sys
 import time
 import django
-import shutil
+import signal
+import datetime
+import zipfile
 import asyncio
 import logging
 import multiprocessing
+import multiprocessing.connection
 import threading
-from datetime import datetime
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import uvloop
 from asgiref.sync import sync_to_async
 
 
@@ -22,12 +27,50 @@ django.setup()
 
 
 from django.db import connection
+from django.db.models import Q
 from realtime_monitor.models import MonitorAccount
-from realtime_monitor.core.account_monitor import AccountMonitor
+from realtime_monitor.core.account_monitor import AccountMonitor, stop_playwright, HEARTBEAT_KEY
+from realtime_monitor.core.data_crawler import close_callback_client
 from realtime_monitor.core.db_health_check import db_health_checker, periodic_db_health_check
 from common.aws_cli.file_backend import FileBackend, FilePrefix
+from common.perf_patches import install_http_blocksize, install_playwright_orjson
 from middlewares.trace_id import set_trace_id, generate_trace_id
-from django.utils import timezone
+from linkedin_realtime_monitor.settings import redis_client
+
+# 健康检查轮询间隔（秒）：进程状态有变化时回到最小值，空闲时按倍数逐步放大到最大值
+HEALTH_CHECK_MIN_INTERVAL = float(os.environ.get('HEALTH_CHECK_MIN_INTERVAL', '15'))
+HEALTH_CHECK_MAX_INTERVAL = float(os.environ.get('HEALTH_CHECK_MAX_INTERVAL', '300'))
+HEALTH_CHECK_BACKOFF = float(os.environ.get('HEALTH_CHECK_BACKOFF', '1.5'))
+
+# 心跳超时时间（秒）：超过这个时间没有心跳就重启监听进程
+HEARTBEAT_TIMEOUT = 300
+# 进程启动后的宽限期（秒）：初始化浏览器、登录检查到第一次心跳之前不做心跳超时检查，不能小于 HEARTBEAT_TIMEOUT
+HEARTBEAT_STARTUP_GRACE = max(float(os.environ.get('HEARTBEAT_STARTUP_GRACE', '300')), HEARTBEAT_TIMEOUT)
+
+# 管理进程只用到账号的这些字段（启动检查、心跳检查、上传 profile），查询时不加载整行
+ACCOUNT_STATE_FIELDS = ('id', 'email', 'status', 'monitor_enabled', 'last_heartbeat_at')
+
+# 监听子进程从 forkserver 模板进程 fork：模板进程预先导入 Playwright/Django 相关模块，
+# 子进程启动时不需要复制主进程的地址空间（ORM 状态、缓存、数据库连接）
+MP_CONTEXT = multiprocessing.get_context('forkserver')
+MP_CONTEXT.set_forkserver_preload(['realtime_monitor.core.account_monitor'])
+
+# Chrome 锁文件和临时文件：上传前从 profile 目录删除（否则下次启动 Chrome 会报 profile 被占用），打包时也跳过
+PROFILE_SKIP_FILES = frozenset({'SingletonLock', 'lockfile', 'SingletonSocket', 'SingletonCookie'})
+
+
+class _ZipPipeReader:
+    """包装管道读端：读到 EOF 时检查打包线程的结果，打包失败则抛出异常中止上传，避免把不完整的 zip 覆盖到 S3"""
+
+    def __init__(self, reader, zip_future):
+        self._reader = reader
+        self._zip_future = zip_future
+
+    def read(self, size=-1):
+        data = self._reader.read(size)
+        if not data:
+            self._zip_future.result()
+        return data
 
 
 class MonitorManager:
@@ -37,6 +80,16 @@ class MonitorManager:
         self.processes: Dict[str, multiprocessing.Process] = {}
         self.should_stop = False
         self._start_lock = threading.Lock()  # 用于防止并发启动同一账号
+        self._poll_interval = HEALTH_CHECK_MIN_INTERVAL
+        # 账号缓存：由启动加载和每轮健康检查的批量查询刷新，进程启动/停止时失效
+        self._account_cache: Dict[str, MonitorAccount] = {}
+        # 已在事件循环上注册 sentinel 的子进程，进程退出时立即回调，不需要轮询 is_alive()
+        self._watched: Dict[str, multiprocessing.Process] = {}
+        self._exit_tasks = set()
+        # 子进程启动时间（time.time()），心跳超时检查用它做启动宽限，并忽略早于本次启动的旧心跳
+        self._started_at: Dict[str, float] = {}
+        # 正在停止的账号：等待进程退出期间仍在进程列表中，退出回调和新账号启动需要跳过
+        self._stopping = set()
 
     def start(self):
         """启动管理器"""
@@ -67,9 +120,10 @@ class MonitorManager:
             accounts = list(MonitorAccount.objects.filter(
                 monitor_enabled=True,
                 status='active'
-            ))
+            ).only(*ACCOUNT_STATE_FIELDS))
 
             logging.info(f"Loading {len(accounts)} accounts to monitor")
+            self._account_cache.update((str(account.id), account) for account in accounts)
             for account in accounts:
                 account_id = str(account.id)
                 # 避免重复启动
@@ -82,6 +136,39 @@ class MonitorManager:
 
     def start_account_monitor(self, account_id: str):
         """启动单个账号监听进程"""
+        if self._check_can_start(account_id):
+            self._spawn_account_process(account_id)
+
+    def _check_can_start(self, account_id: str) -> bool:
+        """检查账号是否需要启动（会访问数据库，需要在 thread_sensitive 的线程中执行）"""
+        if account_id in self.processes:
+            logging.warning(f"Monitor for {account_id} already running")
+            return False
+
+        # 检查 monitor_enabled 和 status 状态，优先使用本轮已查询到的账号
+        try:
+            account = self._account_cache.pop(account_id, None)
+            if account is None:
+                account = MonitorAccount.objects.only(*ACCOUNT_STATE_FIELDS).get(id=int(account_id))
+            if not account.monitor_enabled:
+                logging.info(f"Account {account_id} monitor_enabled is False, skipping start")
+                return False
+            if account.status == 'error':
+                logging.warning(
+                    f"Account {account_id} status is 'error', skipping start. "
+                    f"Please manually fix the issue and set status to 'active'."
+                )
+                return False
+        except MonitorAccount.DoesNotExist:
+            logging.warning(f"Account {account_id} not found, skipping start")
+            return False
+        except Exception as e:
+            logging.error(f"Error checking account {account_id}: {e}", exc_info=True)
+            return False
+        return True
+
+    def _spawn_account_process(self, account_id: str):
+        """创建并启动监听子进程，不访问数据库，可以在任意线程中执行"""
         # 使用锁保护，防止并发启动同一账号
         with self._start_lock:
             # 双重检查：锁内再次检查，防止竞态条件
@@ -89,29 +176,11 @@ class MonitorManager:
                 logging.warning(f"Monitor for {account_id} already running")
                 return
 
-            # 检查 monitor_enabled 和 status 状态
-            try:
-                # 在当前线程中关闭并重新创建连接
-                connection.close()
-                account = MonitorAccount.objects.get(id=int(account_id))
-                if not account.monitor_enabled:
-                    logging.info(f"Account {account_id} monitor_enabled is False, skipping start")
-                    return
-                if account.status == 'error':
-                    logging.warning(
-                        f"Account {account_id} status is 'error', skipping start. "
-                        f"Please manually fix the issue and set status to 'active'."
-                    )
-                    return
-            except MonitorAccount.DoesNotExist:
-                logging.warning(f"Account {account_id} not found, skipping start")
-                return
-            except Exception as e:
-                logging.error(f"Error checking account {account_id}: {e}", exc_info=True)
-                return
+            # 清掉上一个进程留下的 Redis 心跳，避免新进程被当成还在用旧心跳
+            self._clear_heartbeat(account_id)
 
-            # 创建子进程
-            process = multiprocessing.Process(
+            # 创建子进程：从 forkserver 的模板进程 fork，不复制主进程的内存和数据库连接
+            process = MP_CONTEXT.Process(
                 target=self._run_account_monitor,
                 args=(account_id,),
                 name=f"monitor_{account_id}"
@@ -120,52 +189,85 @@ class MonitorManager:
 
             # 注册到进程字典（在锁保护下）
             self.processes[account_id] = process
+            self._started_at[account_id] = time.time()
             logging.info(f"Started monitor for account {account_id}, PID: {process.pid}")
 
+    def start_account_monitors(self, account_ids: List[str]):
+        """依次启动多个账号的监听进程，单个账号启动失败不影响其他账号"""
+        for account_id in account_ids:
+            try:
+                self.start_account_monitor(account_id)
+            except Exception as e:
+                logging.error(f"Error starting monitor {account_id}: {e}", exc_info=True)
+
     def _remove_process_only(self, account_id: str):
         """仅从进程列表中移除，不执行停止和上传操作（用于 error 状态的账号）"""
         with self._start_lock:
+            self._started_at.pop(account_id, None)
             if account_id in self.processes:
                 del self.processes[account_id]
                 logging.info(f"Removed process {account_id} from process list (account in error state)")
 
     def stop_account_monitor(self, account_id: str):
         """停止单个账号监听进程，然后由主进程上传 profile 到 S3"""
-        # 使用锁保护，获取进程引用
-        with self._start_lock:
-            if account_id not in self.processes:
-                logging.warning(f"Monitor for {account_id} not found")
-                return
-            process = self.processes[account_id]
-        
-        # 关闭进程（不在锁内执行，避免长时间持有锁）
-        logging.info(f"Sending terminate signal to process {account_id}...")
-        process.terminate()
-        process.join(timeout=30)  # 等待进程关闭
+        if self._terminate_account_process(account_id):
+            self._upload_account_profile(account_id)
+            logging.info(f"Stopped monitor for account {account_id}")
 
-        if process.is_alive():
-            logging.warning(f"Process {account_id} didn't terminate gracefully, killing...")
-            process.kill()
-            process.join(timeout=5)
+    def _terminate_account_process(self, account_id: str) -> bool:
+        """关闭监听子进程并从进程列表中移除，不访问数据库，可以在任意线程中执行
 
-        # 进程已关闭，从进程列表中移除（需要锁保护）
+        Returns:
+            进程是否存在
+        """
+        # 使用锁保护，获取进程引用；停止期间标记为 stopping，进程退出回调和新账号启动都会跳过它
         with self._start_lock:
-            if account_id in self.processes:
-                del self.processes[account_id]
-        
-        logging.info(f"Process {account_id} stopped")
+            process = self.processes.get(account_id)
+            if process is None:
+                logging.warning(f"Monitor for {account_id} not found")
+                return False
+            self._stopping.add(account_id)
 
-        # 主进程上传 profile 到 S3
         try:
-            connection.close()
-            account = MonitorAccount.objects.get(id=int(account_id))
+            # 关闭进程（不在锁内执行，避免长时间持有锁）
+            logging.info(f"Sending terminate signal to process {account_id}...")
+            process.terminate()
+            process.join(timeout=30)  # 等待进程关闭
+
+            if process.is_alive():
+                logging.warning(f"Process {account_id} didn't terminate gracefully, killing...")
+                process.kill()
+                process.join(timeout=5)
+        finally:
+            # 进程已关闭，从进程列表中移除（需要锁保护）
+            with self._start_lock:
+                if self.processes.get(account_id) is process:
+                    del self.processes[account_id]
+                    self._started_at.pop(account_id, None)
+                self._stopping.discard(account_id)
+
+        self._clear_heartbeat(account_id)
+        logging.info(f"Process {account_id} stopped")
+        return True
+
+    def _upload_account_profile(self, account_id: str):
+        """进程停止后由主进程上传 profile 到 S3"""
+        account = self._get_profile_account(account_id)
+        if account is not None:
             self.upload_profile_to_s3(account)
+
+    def _get_profile_account(self, account_id: str) -> Optional[MonitorAccount]:
+        """上传 profile 只用到 id 和 email，缓存中有就不再查库（会访问数据库，需要在 thread_sensitive 的线程中执行）"""
+        try:
+            account = self._account_cache.pop(account_id, None)
+            if account is None:
+                account = MonitorAccount.objects.only(*ACCOUNT_STATE_FIELDS).get(id=int(account_id))
+            return account
         except MonitorAccount.DoesNotExist:
             logging.warning(f"Account {account_id} not found, skipping profile upload")
         except Exception as e:
-            logging.error(f"Failed to upload profile for {account_id}: {e}", exc_info=True)
-        
-        logging.info(f"Stopped monitor for account {account_id}")
+            logging.error(f"Failed to load account {account_id} for profile upload: {e}", exc_info=True)
+        return None
 
     def upload_profile_to_s3(self, account: MonitorAccount):
         """上传 Chrome profile 到 S3（主进程执行）"""
@@ -178,64 +280,83 @@ class MonitorManager:
 
             logging.info(f"Uploading profile to S3 for account {account.id} ({account.email})")
 
-            # 清理锁文件和临时文件
-            lock_files = ['SingletonLock', 'lockfile']
-            temp_files = ['SingletonSocket', 'SingletonCookie']
-
-            for lock_file in lock_files:
-                lock_path = os.path.join(profile_dir, lock_file)
-                if os.path.exists(lock_path):
+            # 清理锁文件和临时文件；SingletonLock 等是指向已退出进程的符号链接，用 lexists 判断
+            for name in PROFILE_SKIP_FILES:
+                lock_path = os.path.join(profile_dir, name)
+                if os.path.lexists(lock_path):
                     try:
                         os.remove(lock_path)
-                        logging.info(f'Cleaned lock file: {lock_file}')
-                    except Exception as e:
-                        logging.warning(f'Failed to clean lock file {lock_file}: {str(e)}')
-
-            for temp_file in temp_files:
-                temp_path = os.path.join(profile_dir, temp_file)
-                if os.path.exists(temp_path):
-                    try:
-                        os.remove(temp_path)
-                        logging.info(f'Cleaned temp file: {temp_file}')
+                        logging.info(f'Cleaned lock file: {name}')
                     except Exception as e:
-                        logging.warning(f'Failed to clean temp file {temp_file}: {str(e)}')
+                        logging.warning(f'Failed to clean lock file {name}: {str(e)}')
 
-            # 打包并上传
-            logging.info(f'Packing profile: {profile_dir}')
-            zip_file_path = shutil.make_archive(profile_dir, 'zip', profile_dir)
+            # 边打包边上传：后台线程把 zip 写入管道（跳过锁文件和临时文件），当前线程从管道读取分片上传，不生成临时 zip 文件
             online_file_name = f'{account.email}.zip'
-
-            logging.info(f'Uploading profile to S3: {online_file_name}')
-            fb = FileBackend()
-            fb.upload_file(zip_file_path, online_file_name, FilePrefix.CHROME_PROFILE_PREFIX)
+            logging.info(f'Packing and uploading profile to S3: {profile_dir} -> {online_file_name}')
+            read_fd, write_fd = os.pipe()
+            with ThreadPoolExecutor(max_workers=1) as executor, os.fdopen(read_fd, 'rb') as reader:
+                zip_future = executor.submit(self._write_profile_zip, profile_dir, write_fd)
+                fb = FileBackend()
+                fb.upload_fileobj(_ZipPipeReader(reader, zip_future), online_file_name, FilePrefix.CHROME_PROFILE_PREFIX)
             logging.info(f'Profile uploaded successfully: {online_file_name}')
 
-            # 清理临时 zip 文件
-            os.remove(zip_file_path)
-            logging.info(f'Cleaned temporary zip file')
-
         except Exception as e:
             logging.error(f"Failed to upload profile to S3 for account {account.id}: {e}", exc_info=True)
 
-    def restart_account_monitor(self, account_id: str):
-        """重启单个账号监听进程"""
+    @staticmethod
+    def _write_profile_zip(profile_dir: str, write_fd: int):
+        """把 profile 目录打包成 zip 写入管道，归档内路径和 shutil.make_archive(profile_dir, 'zip', profile_dir) 一致
+
+        用 os.scandir 单次遍历，DirEntry 自带文件类型，不再逐个 stat；锁文件和临时文件直接跳过（删除失败时也不会被打包）
+        """
+        def add_dir(zf, dir_path, arc_dir):
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.name in PROFILE_SKIP_FILES:
+                        continue
+                    arcname = f'{arc_dir}/{entry.name}' if arc_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        zf.write(entry.path, arcname)
+                        add_dir(zf, entry.path, arcname)
+                    elif entry.is_file():
+                        zf.write(entry.path, arcname)
+
+        with os.fdopen(write_fd, 'wb') as writer, \
+                zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            add_dir(zf, profile_dir, '')
+
+    async def restart_account_monitor(self, account_id: str):
+        """重启单个账号监听进程，等待期间不阻塞事件循环，多个账号的重启可以并发
+
+        数据库操作保持 thread_sensitive（Django 连接不跨线程共享），进程停止/启动和 profile 上传
+        不访问数据库，放到线程池中执行，多个账号的等待退出和上传互不阻塞
+        """
         logging.info(f"Restarting monitor for account {account_id}")
-        self.stop_account_monitor(account_id)
-        time.sleep(2)
-        self.start_account_monitor(account_id)
+        if await sync_to_async(self._terminate_account_process, thread_sensitive=False)(account_id):
+            account = await sync_to_async(self._get_profile_account)(account_id)
+            if account is not None:
+                await sync_to_async(self.upload_profile_to_s3, thread_sensitive=False)(account)
+            logging.info(f"Stopped monitor for account {account_id}")
+        await asyncio.sleep(2)
+        if await sync_to_async(self._check_can_start)(account_id):
+            await sync_to_async(self._spawn_account_process, thread_sensitive=False)(account_id)
 
     async def health_check_loop(self):
-        """健康检查循环 - 每分钟检查一次（包括数据库健康检查）"""
+        """健康检查循环 - 自适应间隔检查（包括数据库健康检查）"""
         # 启动数据库健康检查任务
-        db_check_task = asyncio.create_task(periodic_db_health_check(interval=120))
+        db_check_task = asyncio.create_task(periodic_db_health_check(interval=int(os.environ.get('DB_HEALTH_CHECK_INTERVAL', '120'))))
         
         try:
             while not self.should_stop:
                 try:
-                    await self.check_all_monitors()
-                    await asyncio.sleep(60)
+                    changed = await self.check_all_monitors()
+                    if changed:
+                        self._poll_interval = HEALTH_CHECK_MIN_INTERVAL
+                    else:
+                        self._poll_interval = min(self._poll_interval * HEALTH_CHECK_BACKOFF, HEALTH_CHECK_MAX_INTERVAL)
                 except Exception as e:
                     logging.error(f"Health check error: {e}", exc_info=True)
+                await asyncio.sleep(self._poll_interval)
         finally:
             # 取消数据库健康检查任务
             db_check_task.cancel()
@@ -245,79 +366,57 @@ class MonitorManager:
                 pass
 
     async def check_all_monitors(self):
-        """检查所有监听进程的健康状态和 monitor_enabled 状态"""
-        # 获取所有需要监听的账号（monitor_enabled=True）
-        @sync_to_async
-        def get_enabled_accounts():
-            # 在线程内关闭连接，让 Django 创建新连接
-            connection.close()
-            
-            # 确保数据库连接可用
-            if not db_health_checker.ensure_connection():
-                logging.error("Database connection not available in health check")
-                return set()
-            
-            return set(
-                str(acc.id) for acc in MonitorAccount.objects.filter(
-                    monitor_enabled=True,
-                    status='active'
-                )
-            )
-        
-        enabled_accounts = await get_enabled_accounts()
-
-        # 检查当前运行的进程
+        """检查所有监听进程的健康状态和 monitor_enabled 状态
+
+        Returns:
+            本轮是否启动、停止、重启或移除了进程
+        """
+        changed = False
+        self._watch_processes()
+        account_states = await sync_to_async(self.get_all_account_states)(list(self.processes))
+        if account_states is None:
+            # 数据库不可用时跳过本轮，避免把所有账号当成已关闭而停掉进程
+            return changed
+        self._account_cache = dict(account_states)
+        heartbeats = await sync_to_async(self.get_heartbeats)(list(self.processes))
+
+        # 需要监听的账号（monitor_enabled=True 且 status='active'）
+        enabled_accounts = {
+            account_id for account_id, account in account_states.items()
+            if account.monitor_enabled and account.status == 'active'
+        }
+
+        # 检查当前运行的进程，需要重启的账号收集起来最后并发重启
+        restarts = []
         for account_id, process in list(self.processes.items()):
             try:
                 # 如果账号的 monitor_enabled 为 False，停止进程
                 if account_id not in enabled_accounts:
                     logging.info(f"Account {account_id} monitor_enabled is False, stopping monitor...")
                     await sync_to_async(self.stop_account_monitor)(account_id)
+                    changed = True
                     continue
 
-                # 检查进程是否存活
-                if not process.is_alive():
-                    # 检查账号状态，如果是 error 状态，不重启
-                    @sync_to_async
-                    def check_account_status():
-                        connection.close()
-                        try:
-                            account = MonitorAccount.objects.get(id=int(account_id))
-                            return account.status
-                        except MonitorAccount.DoesNotExist:
-                            return None
-                    
-                    account_status = await check_account_status()
-                    if account_status == 'error':
-                        logging.warning(
-                            f"Monitor {account_id} is dead, but account status is 'error', "
-                            f"skipping restart. Please manually fix the issue and set status to 'active'."
-                        )
-                        # 从进程列表中移除，但不重启
-                        await sync_to_async(self._remove_process_only)(account_id)
-                    else:
-                        logging.error(f"Monitor {account_id} is dead, restarting...")
-                        await sync_to_async(self.restart_account_monitor)(account_id)
+                # 进程退出由 sentinel 回调处理（_on_child_exit），这里只检查心跳时间
+                # 刚启动的进程还没来得及写第一次心跳，宽限期内不检查
+                now = time.time()
+                started_at = self._started_at.get(account_id, 0.0)
+                if now - started_at < HEARTBEAT_STARTUP_GRACE:
                     continue
 
-                # 检查心跳时间（通过数据库）
-                last_heartbeat = await self._get_last_heartbeat(account_id)
+                # 优先用 Redis 心跳，Redis 中没有时用数据库里定期同步的 last_heartbeat_at 兜底；
+                # 早于本次启动的心跳属于上一个进程，按启动时间计算
+                account = account_states[account_id]
+                last_heartbeat = heartbeats.get(account_id)
+                if last_heartbeat is None and account.last_heartbeat_at:
+                    last_heartbeat = account.last_heartbeat_at.timestamp()
+                last_heartbeat = max(last_heartbeat or 0.0, started_at)
                 if last_heartbeat:
-                    time_since_heartbeat = (timezone.now() - last_heartbeat).total_seconds()
+                    time_since_heartbeat = now - last_heartbeat
 
-                    if time_since_heartbeat > 300:  # 5分钟无心跳
+                    if time_since_heartbeat > HEARTBEAT_TIMEOUT:  # 5分钟无心跳
                         # 检查账号状态，如果是 error 状态，不重启
-                        @sync_to_async
-                        def check_account_status():
-                            connection.close()
-                            try:
-                                account = MonitorAccount.objects.get(id=int(account_id))
-                                return account.status
-                            except MonitorAccount.DoesNotExist:
-                                return None
-                        
-                        account_status = await check_account_status()
-                        if account_status == 'error':
+                        if account.status == 'error':
                             logging.warning(
                                 f"Monitor {account_id} heartbeat timeout ({time_since_heartbeat:.0f}s), "
                                 f"but account status is 'error', skipping restart. "
@@ -327,39 +426,133 @@ class MonitorManager:
                             await sync_to_async(self._remove_process_only)(account_id)
                         else:
                             logging.error(f"Monitor {account_id} heartbeat timeout ({time_since_heartbeat:.0f}s), restarting...")
-                            await sync_to_async(self.restart_account_monitor)(account_id)
+                            restarts.append(account_id)
+                        changed = True
             except Exception as e:
                 logging.error(f"Error checking monitor {account_id}: {e}", exc_info=True)
 
-        # 检查是否有新的账号需要启动
-        for account_id in enabled_accounts:
-            try:
-                if account_id not in self.processes:
-                    logging.info(f"New account {account_id} enabled, starting monitor...")
-                    await sync_to_async(self.start_account_monitor)(account_id)
-            except Exception as e:
-                logging.error(f"Error starting monitor {account_id}: {e}", exc_info=True)
+        if restarts:
+            results = await asyncio.gather(
+                *(self.restart_account_monitor(account_id) for account_id in restarts),
+                return_exceptions=True
+            )
+            for account_id, result in zip(restarts, results):
+                if isinstance(result, Exception):
+                    logging.error(f"Error restarting monitor {account_id}: {result}", exc_info=result)
+
+        # 检查是否有新的账号需要启动，一次切换到同步线程内依次启动
+        new_accounts = [
+            account_id for account_id in enabled_accounts
+            if account_id not in self.processes and account_id not in self._stopping
+        ]
+        if new_accounts:
+            logging.info(f"New accounts {new_accounts} enabled, starting monitors...")
+            await sync_to_async(self.start_account_monitors)(new_accounts)
+            changed = True
+
+        self._watch_processes()
+        return changed
+
+    def _watch_processes(self):
+        """为还没注册的子进程在事件循环上注册 sentinel，进程退出时 sentinel 可读，触发 _on_child_exit"""
+        loop = asyncio.get_running_loop()
+        for account_id, process in list(self.processes.items()):
+            if self._watched.get(account_id) is process:
+                continue
+            loop.add_reader(process.sentinel, self._on_child_exit, account_id, process)
+            self._watched[account_id] = process
+
+    def _on_child_exit(self, account_id: str, process: multiprocessing.Process):
+        """子进程退出回调（在事件循环上执行），注销 sentinel 后异步处理重启"""
+        asyncio.get_running_loop().remove_reader(process.sentinel)
+        if self._watched.get(account_id) is process:
+            del self._watched[account_id]
+        if self.should_stop:
+            return
+        task = asyncio.create_task(self._handle_dead_process(account_id, process))
+        self._exit_tasks.add(task)
+        task.add_done_callback(self._exit_tasks.discard)
 
-    async def _get_last_heartbeat(self, account_id: str) -> Optional[datetime]:
-        """获取进程的最后心跳时间"""
+    async def _handle_dead_process(self, account_id: str, process: multiprocessing.Process):
+        """子进程退出后按账号状态决定重启还是移除"""
         try:
-            # 使用异步 ORM 方法，Django 会自动管理连接
-            account = await MonitorAccount.objects.aget(id=int(account_id))
-            return account.last_heartbeat_at
-        except MonitorAccount.DoesNotExist:
-            return None
+            if await sync_to_async(self._check_dead_process)(account_id, process):
+                await self.restart_account_monitor(account_id)
+        except Exception as e:
+            logging.error(f"Error handling dead monitor {account_id}: {e}", exc_info=True)
+        self._watch_processes()
+
+    def _check_dead_process(self, account_id: str, process: multiprocessing.Process) -> bool:
+        """子进程退出后检查是否需要重启，正在停止（_stopping）或已被替换的进程直接忽略
+
+        Returns:
+            是否需要重启
+        """
+        with self._start_lock:
+            if account_id in self._stopping or self.processes.get(account_id) is not process:
+                return False
+
+        # 检查账号状态，如果是 error 状态，不重启（子进程通常是把状态置为 error 后退出的，需要读最新状态）
+        account_status = MonitorAccount.objects.filter(id=int(account_id)).values_list('status', flat=True).first()
+        if account_status == 'error':
+            logging.warning(
+                f"Monitor {account_id} is dead, but account status is 'error', "
+                f"skipping restart. Please manually fix the issue and set status to 'active'."
+            )
+            # 从进程列表中移除，但不重启
+            self._remove_process_only(account_id)
+            return False
+        logging.error(f"Monitor {account_id} is dead, restarting...")
+        return True
+
+    @staticmethod
+    def _clear_heartbeat(account_id: str):
+        """删除账号在 Redis 中的心跳，失败只记录日志（健康检查还会按进程启动时间兜底）"""
+        try:
+            redis_client.delete(HEARTBEAT_KEY.format(account_id))
+        except Exception as e:
+            logging.error(f"Error clearing heartbeat for {account_id}: {e}")
+
+    @staticmethod
+    def get_heartbeats(account_ids: List[str]) -> Dict[str, float]:
+        """一次 MGET 读取子进程写入 Redis 的心跳时间戳，读取失败时返回空字典（退回到数据库心跳）"""
+        if not account_ids:
+            return {}
+        try:
+            values = redis_client.mget([HEARTBEAT_KEY.format(account_id) for account_id in account_ids])
         except Exception as e:
-            logging.error(f"Error getting heartbeat for {account_id}: {e}", exc_info=True)
+            logging.error(f"Error reading heartbeats from Redis: {e}", exc_info=True)
+            return {}
+        return {
+            account_id: float(value)
+            for account_id, value in zip(account_ids, values)
+            if value is not None
+        }
+
+    @staticmethod
+    def get_all_account_states(running_ids: List[str]) -> Optional[Dict[str, MonitorAccount]]:
+        """一次查询取回需要监听的账号和正在运行的账号的状态
+
+        Returns:
+            {account_id: MonitorAccount}，只加载健康检查和上传 profile 用到的字段，数据库不可用时返回 None
+        """
+        # 复用线程内的持久连接，ensure_connection 检查可用性，断开时才重连
+        if not db_health_checker.ensure_connection():
+            logging.error("Database connection not available in health check")
             return None
 
+        accounts = MonitorAccount.objects.filter(
+            Q(monitor_enabled=True, status='active') | Q(id__in=[int(account_id) for account_id in running_ids])
+        ).only(*ACCOUNT_STATE_FIELDS)
+        return {str(account.id): account for account in accounts}
+
     @staticmethod
     def _run_account_monitor(account_id: str):
         """子进程入口点"""
-        # 重要：关闭继承的数据库连接
+        # forkserver 启动的子进程不会继承主进程的数据库连接，这里关闭只是保险
         connection.close()
 
         # 重新设置 Django
-        import django
         django.setup()
 
         # 为子进程设置独立的 trace_id
@@ -367,22 +560,55 @@ class MonitorManager:
         set_trace_id(child_trace_id)
         logging.info(f"AccountMonitor subprocess started for account {account_id} with trace_id: {child_trace_id}")
 
-        # 创建并运行监听器
+        # Playwright 消息解码换成 orjson，必须在启动 driver 之前
+        install_playwright_orjson()
+
+        # 创建并运行监听器，子进程全是 IO（CDP + 数据库），使用 uvloop 事件循环
         monitor = AccountMonitor(account_id)
-        asyncio.run(monitor.run())
+
+        async def _main():
+            try:
+                await monitor.run()
+            finally:
+                await close_callback_client()
+                await stop_playwright()
+
+        uvloop.run(_main())
 
     def shutdown(self):
         """关闭所有监听进程"""
         logging.info("Shutting down MonitorManager...")
         self.should_stop = True
 
-        # 停止所有监听进程
-        account_ids = list(self.processes.keys())
-        logging.info(f"Stopping {len(account_ids)} monitor processes...")
-        
-        for account_id in account_ids:
+        # 停止所有监听进程：先全部发送 terminate，再统一等待 sentinel，超时后只 kill 剩下的进程
+        with self._start_lock:
+            processes = dict(self.processes)
+        logging.info(f"Stopping {len(processes)} monitor processes...")
+
+        for process in processes.values():
+            process.terminate()
+
+        pending = {process.sentinel: account_id for account_id, process in processes.items()}
+        deadline = time.monotonic() + 30
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for sentinel in multiprocessing.connection.wait(list(pending), timeout=remaining):
+                del pending[sentinel]
+
+        for account_id in pending.values():
+            logging.warning(f"Process {account_id} didn't terminate gracefully, killing...")
+            processes[account_id].kill()
+
+        with self._start_lock:
+            for account_id, process in processes.items():
+                process.join(timeout=5)
+                self.processes.pop(account_id, None)
+
+        for account_id in processes:
             try:
-                self.stop_account_monitor(account_id)
+                self._upload_account_profile(account_id)
             except Exception as e:
                 logging.error(f"Error stopping monitor {account_id}: {e}", exc_info=True)
 
@@ -391,33 +617,35 @@ class MonitorManager:
 
 def main():
     """主函数 - 作为独立服务运行"""
-    # 为主进程设置 trace_id
-    main_trace_id = generate_trace_id()
-    set_trace_id(main_trace_id)
-    
-    # 调试：打印系统时间信息
-    import datetime
-    current_ts = time.time()
-    logging.info(
-        f"[System Time Check] time.time()={current_ts}, "
-        f"UTC={datetime.datetime.utcfromtimestamp(current_ts)}, "
-        f"Local={datetime.datetime.fromtimestamp(current_ts)}"
-    )
-    
-    logging.info(f"MonitorManager main process started with trace_id: {main_trace_id}")
-    
-    # 配置基本日志（Django setup 后会使用 Django 的日志配置）
+    # 配置基本日志（Django setup 后会使用 Django 的日志配置），必须在第一条日志之前调用
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s | %(threadName)s | %(levelname)s | %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
+
+    # 为主进程设置 trace_id
+    main_trace_id = generate_trace_id()
+    set_trace_id(main_trace_id)
+
+    # 调试：打印系统时间信息
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        current_ts = time.time()
+        logging.debug(
+            "[System Time Check] time.time()=%s, UTC=%s, Local=%s",
+            current_ts,
+            datetime.datetime.fromtimestamp(current_ts, datetime.timezone.utc),
+            datetime.datetime.fromtimestamp(current_ts),
+        )
+
+    logging.info(f"MonitorManager main process started with trace_id: {main_trace_id}")
+
+    # 主进程负责上传 profile 到 S3，调大 http.client 的发送块
+    install_http_blocksize()
+
     manager = MonitorManager()
 
     # 注册信号处理
-    import signal
-    
     def signal_handler(signum, frame):
         logging.info(f"Received signal {signum}, shutting down...")
         manager.shutdown()
@@ -0,0 +1,17 @@
+# Generated by Django 4.1 on 2026-10-15 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('realtime_monitor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monitoraccount',
+            index=models.Index(condition=models.Q(('monitor_enabled', True), ('status', 'active')), fields=['monitor_enabled', 'status'], name='ma_enabled_active_idx'),
+        ),
+    ]
@@ -39,6 +39,14 @@ class MonitorAccount(models.Model):
         db_table = 'monitor_accounts'
         verbose_name = 'Monitor Account'
         verbose_name_plural = 'Monitor Accounts'
+        indexes = [
+            # 健康检查每轮按 monitor_enabled=True, status='active' 查询，部分索引只包含需要监听的账号
+            models.Index(
+                fields=['monitor_enabled', 'status'],
+                name='ma_enabled_active_idx',
+                condition=models.Q(monitor_enabled=True, status='active'),
+            ),
+        ]
 
 
 class RealtimeConnection(models.Model):
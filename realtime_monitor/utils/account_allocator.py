@@ -1,3 +1,4 @@
+import functools
 import os
 from dataclasses import dataclass
 from typing import Tuple
@@ -5,7 +6,8 @@ from typing import Tuple
 from realtime_monitor.models import MonitorAccount
 
 
-@dataclass
+# 结果会被缓存共享，设为不可变
+@dataclass(frozen=True, slots=True)
 class PodShardInfo:
     pod_name: str
     pod_index: int
@@ -14,6 +16,7 @@ class PodShardInfo:
     end_index: int
 
 
+@functools.lru_cache(maxsize=1)
 def get_pod_index_from_env() -> int:
     """
     从 POD_NAME 环境变量解析当前 Pod 的 index。
@@ -31,6 +34,7 @@ def get_pod_index_from_env() -> int:
         return 0
 
 
+@functools.lru_cache(maxsize=4)
 def get_accounts_per_pod_from_env(default: int = 8) -> int:
     raw = os.environ.get("ACCOUNTS_PER_POD")
     if not raw:
@@ -42,7 +46,9 @@ def get_accounts_per_pod_from_env(default: int = 8) -> int:
         return default
 
 
+@functools.lru_cache(maxsize=1)
 def get_pod_shard_info() -> PodShardInfo:
+    """环境变量在 Pod 生命周期内不变，只解析一次"""
     pod_name = os.environ.get("POD_NAME", "unknown-0")
     pod_index = get_pod_index_from_env()
     accounts_per_pod = get_accounts_per_pod_from_env()
@@ -81,6 +87,6 @@ def get_accounts_for_current_pod():
         )
         .order_by("id")
     )
-    accounts = list(qs)
-    return accounts[shard.start_index : shard.end_index + 1]
+    # 切片会转换成 SQL 的 LIMIT/OFFSET，只取当前 Pod 负责的账号
+    return list(qs[shard.start_index : shard.end_index + 1])
 
@@ -6,13 +6,16 @@ from typing import Dict, List, Optional, Tuple, Pattern
 from datetime import datetime, timezone
 from uuid import uuid4
 
-import requests
+import orjson
+
 from django.conf import settings
 from django.db.models import Q
 from rest_framework import status
 
 from linkedin_realtime_monitor.settings import ENV
 from lkp_client_base_utils.lkp_client_base import LKPClientBase
+from common.http_session import build_session
+from common.ttl_cache import TTLCache
 
 # TODO 测试期间 prod， 正式上线使用 env 变量
 lkpc = LKPClientBase('prod')
@@ -21,6 +24,19 @@ logger = logging.getLogger(__name__)
 
 LOOKUP_USERNAME_ENDPOINT = f"https://api.tuilink.io/account/linkedin_api/lookup-username"
 
+# 模块级复用的 Session，保持和 api.tuilink.io 的 keep-alive 连接
+_session = build_session(pool_connections=16, pool_maxsize=32)
+# (连接超时, 读取超时)：连不上时尽快失败
+LOOKUP_TIMEOUT = (3.05, 10)
+
+# lookup-username 结果的进程内缓存，同一个 profile_id 在 TTL 内不再重复请求；查不到的结果缓存时间更短
+LOOKUP_CACHE_TTL = 3600
+LOOKUP_NEGATIVE_CACHE_TTL = 60
+LOOKUP_CACHE_MAXSIZE = 4096
+_lookup_cache = TTLCache(LOOKUP_CACHE_TTL, LOOKUP_CACHE_MAXSIZE)
+# 缓存未命中的标记，查不到账号时缓存的结果本身就是 None
+_MISSING = object()
+
 
 class LinkedInInteractionError(Exception):
     """业务层自定义异常，包含错误码与 HTTP 状态码。"""
@@ -31,7 +47,7 @@ class LinkedInInteractionError(Exception):
         self.http_status = http_status
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SenderAccount:
     email: str
     hash_id: str
@@ -45,7 +61,7 @@ def resolve_sender_account(profile_id: str) -> SenderAccount:
     if not profile_id:
         raise LinkedInInteractionError("missing_sender_profile_id", status.HTTP_400_BAD_REQUEST)
 
-    lookup = _lookup_account_from_api(profile_id)
+    lookup = _lookup_account_cached(profile_id)
     if not lookup:
         raise LinkedInInteractionError("sender_not_found", status.HTTP_400_BAD_REQUEST)
 
@@ -63,17 +79,28 @@ def resolve_sender_account(profile_id: str) -> SenderAccount:
     )
 
 
+def _lookup_account_cached(profile_id: str) -> Optional[Dict[str, Optional[str]]]:
+    """_lookup_account_from_api 的缓存版本，结果按 profile_id 缓存，请求异常不缓存"""
+    result = _lookup_cache.get(profile_id, _MISSING)
+    if result is not _MISSING:
+        return result
+    result = _lookup_account_from_api(profile_id)
+    _lookup_cache.set(profile_id, result, ttl=LOOKUP_CACHE_TTL if result else LOOKUP_NEGATIVE_CACHE_TTL)
+    return result
+
+
 def _lookup_account_from_api(profile_id: str) -> Optional[Dict[str, Optional[str]]]:
     if not LOOKUP_USERNAME_ENDPOINT or not profile_id:
         return None
     params_candidates = {'identifier': profile_id}
-    resp = requests.get(LOOKUP_USERNAME_ENDPOINT, params=params_candidates, timeout=10)
+    resp = _session.get(LOOKUP_USERNAME_ENDPOINT, params=params_candidates, timeout=LOOKUP_TIMEOUT)
     if resp.status_code != 200:
         logger.debug("lookup-username non-200 response: %s %s", resp.status_code, resp.text[:200])
         return None
-    payload = resp.json()
+    payload = orjson.loads(resp.content)
 
-    data = payload.get("data")
+    # 查不到账号时 data 可能为 null
+    data = payload.get("data") or {}
     username = data.get("username")
     hash_id = data.get("hash_id")
 
@@ -1,8 +1,11 @@
+from django.db import IntegrityError, transaction
 from django.shortcuts import render
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
 
 from common.lkp_client import LKPClient
+from common.ttl_cache import TTLCache
 from realtime_monitor.models import MonitorAccount
 from rest_framework.response import Response
 
@@ -11,6 +14,29 @@ from realtime_monitor.utils.linkedin_interaction import resolve_sender_account,
 
 # Create your views here.
 
+# 模块级复用的 LKP 客户端，避免每个请求都重新构造
+_lkp_client = LKPClient()
+
+# get_cookie 成功结果的短期缓存，同一个账号在 TTL 内重复托管/切换不再请求 LKP；失败结果不缓存，重新绑定后可立即生效
+COOKIE_CACHE_TTL = 60
+COOKIE_CACHE_MAXSIZE = 1024
+_cookie_cache = TTLCache(COOKIE_CACHE_TTL, COOKIE_CACHE_MAXSIZE)
+
+
+def _get_cookie_cached(email):
+    result = _cookie_cache.get(email)
+    if result is not None:
+        return result
+    result = _lkp_client.get_cookie(email)
+    is_success, cookie = result[0], result[1]
+    if is_success and cookie:
+        _cookie_cache.set(email, result)
+    return result
+
+
+def _invalidate_cookie(email):
+    _cookie_cache.pop(email)
+
 
 class MonitorView(APIView):
     """账号托管 API"""
@@ -36,8 +62,7 @@ class MonitorView(APIView):
         email = account_obj.email
         hash_id = account_obj.hash_id
 
-        lkp_client = LKPClient()
-        is_success, cookie, proxy, account_data, user_agent = lkp_client.get_cookie(email)
+        is_success, cookie, proxy, account_data, user_agent = _get_cookie_cached(email)
         if is_success and cookie:
             self._upsert_monitor_account(
                 email=email,
@@ -95,8 +120,7 @@ class MonitorView(APIView):
         email = account_obj.email
         hash_id = account_obj.hash_id
 
-        lkp_client = LKPClient()
-        is_success, cookie, proxy, account_data, user_agent = lkp_client.get_cookie(email)
+        is_success, cookie, proxy, account_data, user_agent = _get_cookie_cached(email)
         if is_success and cookie:
             self._upsert_monitor_account(
                 email=email,
@@ -139,7 +163,15 @@ class MonitorView(APIView):
                 'proxy_password': proxy.get('password'),
             })
 
-        MonitorAccount.objects.update_or_create(
-            email=email,
-            defaults=defaults
-        )
\ No newline at end of file
+        # 绝大多数请求针对已存在的账号，直接 UPDATE 一次往返即可；update() 不触发 auto_now，需要手动带上 updated_at
+        updated = MonitorAccount.objects.filter(email=email).update(updated_at=timezone.now(), **defaults)
+        if not updated:
+            try:
+                with transaction.atomic():
+                    MonitorAccount.objects.create(email=email, **defaults)
+            except IntegrityError:
+                # 并发请求已经先插入了同一个 email，退回到更新
+                MonitorAccount.objects.filter(email=email).update(updated_at=timezone.now(), **defaults)
+        if not monitor_enabled:
+            # 关闭托管后丢弃 cookie 缓存，下次开启时重新从 LKP 获取
+            _invalidate_cookie(email)
\ No newline at end of file